@@ -0,0 +1,117 @@
+import numpy as np
+from matplotlib.image import AxesImage
+
+def bin_points(x, y, c, s, extent, shape):
+    """
+    Aggregate points on a regular grid.
+
+    Parameters
+    ----------
+    x, y : `numpy.ndarray`
+        The coordinates of the points.
+
+    c, s : `numpy.ndarray`
+        The color and size values of the points.
+
+    extent : 4-tuple
+        The (xmin, xmax, ymin, ymax) range covered by the grid.
+        Points outside of it are ignored.
+
+    shape : 2-tuple
+        The number of (rows, columns) of the grid.
+
+    Returns
+    -------
+    A dictionary of (rows, columns) arrays: the number of points per bin
+    ('count') and the mean and max of the color and size values per bin
+    ('c_mean', 'c_max', 's_mean', 's_max'). Empty bins contain NaN.
+    """
+    xmin, xmax, ymin, ymax = extent
+    ny, nx = shape
+    inside = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+    if not inside.all():
+        x, y, c, s = x[inside], y[inside], c[inside], s[inside]
+    ix = ((x - xmin) * (nx / (xmax - xmin))).astype(np.intp)
+    iy = ((y - ymin) * (ny / (ymax - ymin))).astype(np.intp)
+    # points on the upper bounds fall into the last row / column
+    np.minimum(ix, nx-1, out=ix)
+    np.minimum(iy, ny-1, out=iy)
+    bins = iy*nx + ix
+
+    count = np.bincount(bins, minlength=nx*ny)
+    empty = count == 0
+    result = { 'count': count.reshape(shape) }
+    for name, values in [ ('c', c), ('s', s) ]:
+        mean = np.bincount(bins, weights=values, minlength=nx*ny)
+        mean[empty] = np.nan
+        mean[~empty] /= count[~empty]
+        _max = np.full(nx*ny, -np.inf)
+        np.maximum.at(_max, bins, values)
+        _max[empty] = np.nan
+        result[f'{name}_mean'] = mean.reshape(shape)
+        result[f'{name}_max'] = _max.reshape(shape)
+    return result
+
+class DensityImage(AxesImage):
+    def __init__(self, ax, x, y, c, s, statistic='mean', **kwargs):
+        """
+        An image of points aggregated at the screen resolution of an Axes.
+
+        The bins cover the current view limits and are recomputed, right
+        before the image is drawn, whenever the view or the size of the
+        Axes changed. Each pixel is colored by the mean or max of the `c`
+        values of its points and is more opaque where there are more
+        points.
+
+        Parameters
+        ----------
+        ax : `~matplotlib.axes.Axes`
+            The Axes the image belongs to.
+
+        x, y, c, s : `numpy.ndarray`
+            The coordinates, color and size values of the points.
+
+        statistic : `str`
+            'mean' or 'max': how the color values of a bin are combined.
+
+        **kwargs
+            Passed on to `~matplotlib.image.AxesImage` (e.g., cmap, norm).
+        """
+        super().__init__(ax, origin='lower', interpolation='nearest',
+                         **kwargs)
+        self.statistic = statistic
+        self.bins = None
+        self._view_extent = None
+        self._view_key = None
+        self.set_points(x, y, c, s)
+
+    def set_points(self, x, y, c, s):
+        [ self.x, self.y, self.c, self.s ] = [ x, y, c, s ]
+        self._view_key = None
+        self.stale = True
+
+    def get_extent(self):
+        return self._view_extent
+
+    def _rebin(self):
+        ax = self.axes
+        xmin, xmax = sorted(ax.get_xlim())
+        ymin, ymax = sorted(ax.get_ylim())
+        shape = (max(1, int(ax.bbox.height)), max(1, int(ax.bbox.width)))
+        self.bins = bin_points(self.x, self.y, self.c, self.s,
+                               (xmin, xmax, ymin, ymax), shape)
+        values = self.bins[f'c_{self.statistic}']
+        count = self.bins['count']
+        # opacity grows with the (log) number of points in a pixel
+        alpha = np.log1p(count) / max(np.log1p(count.max()), 1)
+        self._view_extent = [ xmin, xmax, ymin, ymax ]
+        self.set_data(np.ma.masked_invalid(values))
+        self.set_alpha(0.3 + 0.7*alpha)
+
+    def draw(self, renderer):
+        ax = self.axes
+        key = (tuple(ax.viewLim.bounds), tuple(ax.bbox.size))
+        if key != self._view_key:
+            self._rebin()
+            self._view_key = key
+        super().draw(renderer)
@@ -9,7 +9,11 @@ import sys
 sys.path.append('../interaction')
 
 from brush import Brush
+from datasource import DataSource
+from selection import Selection, SelectionCoordinator
 import legend
+from aggregate import DensityImage
+from viewport import ViewportCollection, points_in_view, stratified_sample
 from random import Random
 
 from numpy.typing import ArrayLike
@@ -33,7 +37,9 @@ class BubbleChart:
                  xname='x', yname='y', sname='size', cname='color',
                  fig=None, ax=None, cax=None, sax=None,
                  figsize=(10,8), minsize=50, maxsize=500,
-                 cmap='viridis'):
+                 cmap='viridis', blit=False, 
+                 aggregate_threshold=1_000_000, aggregate='mean',
+                 budget=200_000, source=None, columns=None):
         """
         Create a bubble chart
 
@@ -77,6 +83,41 @@ class BubbleChart:
 
         cmap: `str` or `matplotlib.Colormap` 
             The colormap to use in the bubble chart.
+
+        blit : `bool`
+            If True, selection changes are rendered by blitting the data
+            collection over a cached background of the Axes (including
+            its ticks, the colorbar and the size legend) instead of 
+            redrawing the whole figure.
+
+        aggregate_threshold : `int`
+            Above this number of points, the bubbles are replaced by an
+            image of the points aggregated at the screen resolution of 
+            the plot, recomputed whenever the view changes. The size
+            legend is not shown and selections are not rendered in this 
+            mode.
+
+        aggregate : `str`
+            'mean' or 'max': how the color values of the points falling 
+            in the same pixel are combined in aggregate mode.
+
+        budget : `int`
+            The maximum number of bubbles handed to the renderer. Only 
+            the points within the view limits (plus the radius of the 
+            largest bubble) are drawn and, if there are more than 
+            `budget` of them, a deterministic stratified sample of them.
+
+        source : `DataSource`
+            A data source, possibly shared with other views (e.g., a 
+            `Brush`), whose 'x', 'y', 's' and 'c' columns hold the data
+            of the chart. The chart references the columns without 
+            copying them and follows their updates. If None is provided,
+            one is created from `x`, `y`, `s` and `c`.
+
+        columns : `dict`
+            The names of the columns of `source` holding the 'x', 'y', 
+            's' and 'c' data, if they differ from these, e.g., to show 
+            other columns of the same rows than another chart.
         """
         # depending on the info provided, create a layout
         # 1. Do we have an active figure?
@@ -109,111 +150,511 @@ class BubbleChart:
             self.cax = all_axes['color']
             self.sax = all_axes['size']
 
-        [ self.x, self.y, self.s, self.c ] = [ x, y, s, c ]
+        self.columns = { 'x': 'x', 'y': 'y', 's': 's', 'c': 'c' }
+        self.columns.update(columns or {})
+        if source is None:
+            source = DataSource(**{ self.columns['x']: x, 
+                                    self.columns['y']: y,
+                                    self.columns['s']: s, 
+                                    self.columns['c']: c })
+        self.source = source
         self.sizes = None
         self.size_range = [ minsize, maxsize ]
         self.scale = 1
         [ self.xname, self.yname, self.sname, self.cname ] = \
             [ xname, yname, sname, cname ] 
-        [ self.plot_bg, self.plot, self.colorbar, self.legend ] = [ None ]*4
-        self.selected = []
+        [ self.plot, self.image, self.colorbar, self.legend ] = [ None ]*4
+        # Selection changes not yet applied to the drawing order: a new
+        # selection (see `selected`) and/or deltas (see `update_selection`)
+        self._requested = None
+        self._deltas = []
         self.cmap = mpl.colormaps[cmap].resampled(256)
+        self.norm = mpl.colors.Normalize()
+        # Channels whose artists are out of date. The artists are created
+        # once and then only updated for the channels listed here.
+        self._stale = { 'x', 'y', 's', 'c' }
+        # Drawing order of the points in the collection: selected points
+        # are kept at the end of the order so that they are drawn on top.
+        # _order maps a drawing position to a point, _pos is its inverse.
+        [ self._order, self._pos ] = [ None ]*2
+        self._is_selected = None
+        self._nselected = 0
+        # Drawing positions to refresh at the next draw, and whether every
+        # point has to be recolored (the selection was set or cleared)
+        self._changed = []
+        self._recolor_all = False
+        self.blit = blit
+        self._background = None
+        self.aggregate_threshold = aggregate_threshold
+        self.aggregate = aggregate
+        self.aggregated = False
+        # Per-point arrays of the collection, in drawing order. They are
+        # shared with the collection as long as every point is drawn.
+        [ self._offsets, self._sizes, 
+          self._facecolors, self._edgecolors ] = [ None ]*4
+        # Points drawn for the current view, or None if all of them are
+        self.budget = budget
+        self._shown = None
+        self._view_stale = True
+        # Size legend entries, computed for the given (version of s, 
+        # scale, size range). s is versioned by set_data.
+        self._s_version = 0
+        [ self._legend_key, self._legend_entries ] = [ None ]*2
+        # sizes prepared for the next update of s (see `set_data`)
+        self._prepared = None
         if self.s is not None: self.update_sizes()
-    
-    def update_sizes(self):
-        self.sizes = np.array(linscale(self.s, self.size_range[0], 
-                                               self.size_range[1]))
-        self.sizes *= self.scale
+        self.source.subscribe(self._on_source_changed)
+
+    @property
+    def x(self):
+        return self.source.get(self.columns['x'])
+
+    @property
+    def y(self):
+        return self.source.get(self.columns['y'])
+
+    @property
+    def s(self):
+        return self.source.get(self.columns['s'])
+
+    @property
+    def c(self):
+        return self.source.get(self.columns['c'])
+
+    @property
+    def selected(self):
+        """
+        The sorted indices of the selected points. Setting it replaces
+        the selection at the next `draw`.
+        """
+        if self.x is not None:
+            self._apply_selection()
+        if self._order is None:
+            return np.empty(0, dtype=np.intp)
+        n = self._order.shape[0]
+        return np.sort(self._order[n-self._nselected:])
+
+    @selected.setter
+    def selected(self, selected: Selection | ArrayLike):
+        self._requested = selected
+        # deltas given so far are superseded
+        self._deltas.clear()
+
+    def update_selection(self, added: ArrayLike, removed: ArrayLike):
+        """
+        Add and remove points from the selection, e.g., as reported by a
+        live `Brush` while dragging. Only the points whose state changes
+        are rewritten at the next `draw`.
+        """
+        self._deltas.append((np.asarray(added, dtype=np.intp),
+                             np.asarray(removed, dtype=np.intp)))
+
+    def _on_source_changed(self, names):
+        names = { ch for ch, col in self.columns.items() if col in names }
+        self._stale.update(names & { 'x', 'y', 'c' })
+        if 's' in names:
+            self._s_version += 1
+            prepared, self._prepared = self._prepared, None
+            self.update_sizes(prepared)
+
+    def prepare_sizes(self, s: ArrayLike, scale: float|None=None):
+        """
+        The marker sizes and size legend entries of the size data `s` at
+        `scale` (by default, the current one). The chart is not modified,
+        so that this can run in a worker thread; the result is then given
+        to `update_sizes` or `set_data`.
+        """
+        if scale is None: scale = self.scale
+        sizes = np.array(linscale(s, self.size_range[0], self.size_range[1]))
+        sizes *= scale
+        entries = legend.size_legend_entries(s, sizes, nstops=3, 
+                                             log_scale=False)
+        return s, scale, sizes, entries
+
+    def update_sizes(self, prepared: tuple|None=None):
+        """
+        Compute the marker sizes from s and the scale, or take them from
+        the result of `prepare_sizes` if it matches them.
+        """
+        if prepared is not None and prepared[0] is self.s and \
+           prepared[1] == self.scale:
+            self.sizes = prepared[2]
+            self._legend_entries = prepared[3]
+            self._legend_key = self._legend_cache_key()
+        else:
+            self.sizes = np.array(linscale(self.s, self.size_range[0], 
+                                                   self.size_range[1]))
+            self.sizes *= self.scale
+        self._stale.add('s')
 
-    def set_data(self, var: str, data: ArrayLike, name: str|None=None):
+    def set_data(self, var: str, data: ArrayLike, name: str|None=None,
+                 prepared: tuple|None=None):
+        """
+        Replace the data of a channel ('x', 'y', 'c' or 's') and its name.
+        For 's', `prepared` can give the result of `prepare_sizes` for
+        `data`, computed beforehand.
+        """
         if name is None: name = var
         match var.lower():
             case 'x':
-                self.x = data
                 self.xname = name 
+                self.source.update(**{ self.columns['x']: data })
                 return
             case 'y':
-                self.y = data 
                 self.yname = name 
+                self.source.update(**{ self.columns['y']: data })
                 return 
             case 'c' | 'color' | 'colors':
-                self.c = data 
                 self.cname = name 
+                self.source.update(**{ self.columns['c']: data })
                 return 
             case 's' | 'size' | 'sizes':
-                self.s = data
                 self.sname = name 
-                self.update_sizes()
+                self._prepared = prepared
+                self.source.update(**{ self.columns['s']: data })
                 return
-            
-    def draw(self):
-        for a in [ self.plot, self.plot_bg, self.legend ]:
-            if a is not None:
-                a.remove()
-        # We will redraw whatever remains of the artists in this Axes,
-        # e.g. a brushing rectangle
-        to_redraw = self.ax._children
-        self.ax.clear()
-        # colorbar is a special case: removing it will destroy 
-        # the Axes that contains it. We will clear that axes instead
-        # to preserve the container.
-        if self.cax is not None:
-            self.cax.clear()
-        
-        if self.x is None or \
-           self.y is None or \
-           self.c is None or \
-           self.sizes is None:
-            raise ValueError('One of the attributes is not defined')
-
-        if self.selected:
-            # if a selection was made, we will render in two steps:
-            # Step 1: non-selected points in uniform gray 
-            # Step 2: selected points in their native colors
-            mask = np.ones(self.x.shape[0], dtype=bool)
-            mask[self.selected] = False
-            x_masked = self.x[mask]
-            y_masked = self.y[mask]
-            s_masked = self.sizes[mask]
-            x_shown = self.x[self.selected]
-            y_shown = self.y[self.selected]
-            s_shown = self.sizes[self.selected]
-            c_shown = self.c[self.selected]
-            self.plot_bg = self.ax.scatter(x_masked, y_masked, 
-                                           color=(0.9,0.9,0.9), s=s_masked,
-                                           edgecolors=(0.9,0.9,0.9))
-            # Note: we specify the value range so that the colors of the
-            # selected data points do not change
-            self.plot = self.ax.scatter(x_shown, y_shown, c=c_shown, s=s_shown, 
-                                        vmin=np.min(self.c),
-                                        vmax=np.max(self.c),
-                                        edgecolors='black', cmap=self.cmap)
-        else:
-            # otherwise, straight passing of attributes to scatterplot
-            self.plot_bg = None
-            self.plot = self.ax.scatter(self.x, self.y, c=self.c, s=self.sizes, 
-                                        edgecolors='black', cmap=self.cmap)
-
-        # Redraw the artists that are not owned by this bubble chart
-        for a in to_redraw:
-            self.ax.add_artist(a)
 
-        self.ax.set_xlabel(self.xname, weight='bold')
-        self.ax.set_ylabel(self.yname, weight='bold')
+    def _create_colorbar(self):
+        # The collection holds explicit colors so that they can be
+        # rewritten point by point; the colorbar gets the colormap
+        # through a separate mappable that shares its norm.
+        self.mappable = mpl.cm.ScalarMappable(norm=self.norm, cmap=self.cmap)
         if self.cax is not None:
-            self.colorbar = self.fig.colorbar(self.plot, cax=self.cax,
+            self.colorbar = self.fig.colorbar(self.mappable, cax=self.cax,
                                               label=self.cname)
         else:
             # we were given a figure and an Axes but no cax:
             # matplotlib will now create one for us.
-            self.colorbar = self.fig.colorbar(self.plot, ax=self.ax,
+            self.colorbar = self.fig.colorbar(self.mappable, ax=self.ax,
                                               label=self.cname)
             self.cax = get_cax(self.fig, self.cname)
+        if self.sax is not None:
+            self.sax.axis('off')
+        if self.blit:
+            self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        self.ax.callbacks.connect('xlim_changed', self._on_view_changed)
+        self.ax.callbacks.connect('ylim_changed', self._on_view_changed)
+        self.fig.canvas.mpl_connect('resize_event', self._on_view_changed)
+
+    def _create_scatter(self):
+        self._ensure_order()
+        self._offsets = np.column_stack([self.x[self._order], 
+                                         self.y[self._order]])
+        self._sizes = self.sizes[self._order]
+        self._facecolors = self._colors(self._order)
+        self._edgecolors = self._edgecolors_black()
+        self.plot = ViewportCollection(before_draw=self._cull,
+                                       offset_transform=self.ax.transData,
+                                       linewidths=mpl.rcParams['lines.linewidth'])
+        self.ax.add_collection(self.plot, autolim=False)
+        self._shown = None
+        self._view_stale = True
+        self._push()
+        # the arrays were just built from the current order
+        self._changed.clear()
+        self._recolor_all = self._nselected > 0
+        if self.blit:
+            # the collection is drawn over the cached background
+            self.plot.set_animated(True)
+
+    def _ensure_order(self):
+        # (re)start from an empty selection if the number of points changed
+        n = self.x.shape[0]
+        if self._order is not None and self._order.shape[0] == n:
+            return
+        self._order = np.arange(n)
+        self._pos = np.arange(n)
+        self._is_selected = np.zeros(n, dtype=bool)
+        self._nselected = 0
+        self._changed.clear()
+
+    def _colors(self, points):
+        return self.cmap(self.norm(self.c[points]))
 
+    def _edgecolors_black(self):
+        # one black edge color per point so that they can be rewritten
+        # individually
+        edgecolors = np.zeros((self.x.shape[0], 4))
+        edgecolors[:, 3] = 1
+        return edgecolors
+
+    def _promote(self, points):
+        # Move the given (non-selected) points to the selected tail of the
+        # drawing order by swapping them with the non-selected points that
+        # currently sit just before the tail.
+        n = self._order.shape[0]
+        end = n - self._nselected
+        start = end - points.shape[0]
+        self._is_selected[points] = True
+        self._nselected += points.shape[0]
+        outside = points[self._pos[points] < start]
+        occupants = self._order[start:end]
+        evicted = occupants[~self._is_selected[occupants]]
+        self._swap(outside, evicted)
+        return np.concatenate([self._pos[points], self._pos[evicted]])
+
+    def _demote(self, points):
+        # Move the given (selected) points out of the selected tail
+        n = self._order.shape[0]
+        start = n - self._nselected
+        end = start + points.shape[0]
+        self._is_selected[points] = False
+        self._nselected -= points.shape[0]
+        outside = points[self._pos[points] >= end]
+        occupants = self._order[start:end]
+        evicted = occupants[self._is_selected[occupants]]
+        self._swap(outside, evicted)
+        return np.concatenate([self._pos[points], self._pos[evicted]])
+
+    def _swap(self, a, b):
+        pa, pb = self._pos[a], self._pos[b]
+        self._order[pa], self._order[pb] = b, a
+        self._pos[a], self._pos[b] = pb, pa
+
+    def _apply_selection(self):
+        """
+        Update the drawing order of the points whose selection state 
+        changed since the last time, and record the drawing positions 
+        that have to be refreshed.
+        """
+        if self._requested is None and not self._deltas:
+            return
+        self._ensure_order()
+        was_empty = self._nselected == 0
+        if isinstance(self._requested, Selection):
+            mask = self._requested.mask()
+            added = np.flatnonzero(mask & ~self._is_selected)
+            removed = np.flatnonzero(self._is_selected & ~mask)
+        elif self._requested is not None:
+            selected = np.unique(np.asarray(self._requested, dtype=np.intp))
+            previous = self._order[self._order.shape[0]-self._nselected:]
+            added = selected[~self._is_selected[selected]]
+            removed = previous[~np.isin(previous, selected, 
+                                        assume_unique=True)]
+        if self._requested is not None:
+            self._changed.append(self._demote(removed))
+            self._changed.append(self._promote(added))
+            self._requested = None
+        for added, removed in self._deltas:
+            removed = np.unique(removed)
+            self._changed.append(
+                self._demote(removed[self._is_selected[removed]]))
+            added = np.unique(added)
+            self._changed.append(
+                self._promote(added[~self._is_selected[added]]))
+        self._deltas.clear()
+        if was_empty != (self._nselected == 0):
+            self._recolor_all = True
+
+    def _push(self):
+        """
+        Hand the per-point arrays to the collection: all of them if every
+        point is drawn, or only the rows of the points in `_shown`.
+        """
+        if self._shown is None:
+            self.plot.set_offsets(self._offsets)
+            self.plot.set_sizes(self._sizes)
+            self.plot.set_facecolors(self._facecolors)
+            self.plot.set_edgecolors(self._edgecolors)
+            # settle the (unmapped) colors first: it replaces the color
+            # arrays of the collection, which a draw would otherwise do
+            # after they were read back below
+            self.plot.update_scalarmappable()
+            # keep the arrays of the collection (they may be copies) so 
+            # that they can be rewritten in place
+            self._offsets = self.plot.get_offsets()
+            self._sizes = self.plot.get_sizes()
+            self._facecolors = self.plot.get_facecolors()
+            self._edgecolors = self.plot.get_edgecolors()
+        else:
+            # Note: sorting the drawing positions keeps the selected
+            # points on top
+            keep = np.sort(self._pos[self._shown])
+            self.plot.set_offsets(self._offsets[keep])
+            self.plot.set_sizes(self._sizes[keep])
+            self.plot.set_facecolors(self._facecolors[keep])
+            self.plot.set_edgecolors(self._edgecolors[keep])
+
+    def _on_view_changed(self, *args):
+        self._view_stale = True
+
+    def _cull(self):
+        """
+        Restrict the collection to the points in view (at most `budget`
+        of them) if the view changed since the last time.
+        """
+        if not self._view_stale:
+            return
+        self._view_stale = False
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+        visible = points_in_view(self.x, self.y, xlim, ylim, 
+                                 self._view_margin())
+        shown = self._shown
+        if visible.shape[0] == self.x.shape[0] and \
+           visible.shape[0] <= self.budget:
+            self._shown = None
+        else:
+            self._shown = stratified_sample(self.x, self.y, visible, 
+                                            xlim, ylim, self.budget)
+        if shown is not None or self._shown is not None:
+            self._push()
+
+    def _view_margin(self):
+        # radius of the largest bubble, in data units
+        xlim, ylim = self.ax.get_xlim(), self.ax.get_ylim()
+        radius = np.sqrt(np.max(self._sizes)) / 2 * self.fig.dpi / 72
+        width, height = self.ax.bbox.size
+        return (radius * abs(xlim[1]-xlim[0]) / max(width, 1),
+                radius * abs(ylim[1]-ylim[0]) / max(height, 1))
+
+    def shows(self, points: ArrayLike):
+        """
+        Whether any of the given points is drawn in the current view, 
+        i.e., whether changing their selection state changes the chart.
+        """
+        points = np.asarray(points, dtype=np.intp)
+        if self.plot is None or points.shape[0] == 0:
+            return False
+        if self._view_stale:
+            x, y = self.x[points], self.y[points]
+            return points_in_view(x, y, self.ax.get_xlim(), 
+                                  self.ax.get_ylim(), 
+                                  self._view_margin()).shape[0] > 0
+        if self._shown is None:
+            return True
+        return bool(np.isin(points, self._shown).any())
+
+    def _refresh(self, positions):
+        # Rewrite the per-point arrays in place at the given drawing 
+        # positions
+        points = self._order[positions]
+        self._offsets[positions] = \
+            np.column_stack([self.x[points], self.y[points]])
+        self._sizes[positions] = self.sizes[points]
+        self._recolor(positions)
+
+    def _recolor(self, positions):
+        points = self._order[positions]
+        facecolors = self._facecolors
+        edgecolors = self._edgecolors
+        if self._nselected == 0:
+            facecolors[positions] = self._colors(points)
+            edgecolors[positions] = (0, 0, 0, 1)
+        else:
+            # non-selected points in uniform gray, 
+            # selected points in their native colors
+            selected = self._is_selected[points]
+            facecolors[positions] = np.where(selected[:, np.newaxis],
+                                             self._colors(points), 
+                                             (0.9, 0.9, 0.9, 1))
+            edgecolors[positions] = np.where(selected[:, np.newaxis],
+                                             (0, 0, 0, 1), (0.9, 0.9, 0.9, 1))
+
+    def _update_scales(self):
+        stale = self._stale
+        if 'x' in stale or 'y' in stale:
+            # the data artists do not take part in autoscaling
+            self.ax.ignore_existing_data_limits = True
+            self.ax.update_datalim([[np.min(self.x), np.min(self.y)],
+                                    [np.max(self.x), np.max(self.y)]])
+            self.ax.autoscale()
+        if 'c' in stale:
+            # the colorbar follows the norm
+            self.norm.vmin, self.norm.vmax = np.min(self.c), np.max(self.c)
+            if self.colorbar is not None:
+                self.colorbar.set_label(self.cname)
+
+    def _update_plot(self):
+        if self.image is not None:
+            self.image.remove()
+            self.image = None
+        stale = self._stale
+        everything = slice(None)
+        if self.plot is None:
+            self._create_scatter()
+        elif stale:
+            if 'x' in stale or 'y' in stale:
+                if self.x.shape[0] != self._sizes.shape[0]:
+                    self._ensure_order()
+                    self._sizes = self.sizes[self._order]
+                    self._facecolors = self._colors(self._order)
+                    self._edgecolors = self._edgecolors_black()
+                    self._recolor_all = self._nselected > 0
+                self._offsets = np.column_stack([self.x[self._order], 
+                                                 self.y[self._order]])
+                self._view_stale = True
+            if 's' in stale:
+                self._sizes = self.sizes[self._order]
+            if 'c' in stale:
+                self._recolor(everything)
+            self._push()
+
+        self._apply_selection()
+        changed = np.concatenate(self._changed) if self._changed \
+                  else np.empty(0, dtype=np.intp)
+        recolor_all = self._recolor_all
+        self._changed.clear()
+        self._recolor_all = False
+        if changed.shape[0] > 0:
+            self._refresh(changed)
+        if recolor_all:
+            self._recolor(everything)
+        if self._shown is not None and (changed.shape[0] > 0 or recolor_all):
+            self._push()
+        self.plot.stale = True
+
+    def _update_image(self):
+        if self.plot is not None:
+            self.plot.remove()
+            self.plot = None
+        if self.legend is not None:
+            self.legend.remove()
+            self.legend = None
+        if self.image is None:
+            self.image = DensityImage(self.ax, self.x, self.y, self.c, 
+                                      self.sizes, statistic=self.aggregate,
+                                      cmap=self.cmap, norm=self.norm)
+            self.ax.add_image(self.image)
+        elif self._stale:
+            self.image.set_points(self.x, self.y, self.c, self.sizes)
+        # selections are not rendered, but kept up to date for when the
+        # scatter collection is created again
+        self._apply_selection()
+        self._changed.clear()
+
+    def _on_draw(self, event):
+        # a full redraw happened: cache the new static background and
+        # draw the animated artists on top of it
+        self._background = self.fig.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        # the data collection and whatever else is animated in the Axes,
+        # e.g. the rectangle of a blitting brush
+        artists = [ a for a in self.ax.get_children() 
+                    if a.get_animated() and a.get_visible() ]
+        for a in sorted(artists, key=lambda a: a.get_zorder()):
+            self.ax.draw_artist(a)
+
+    def blit_update(self):
+        """
+        Redraw the animated artists over the cached background. 
+        Falls back to a full redraw if no background is available.
+        """
+        canvas = self.fig.canvas
+        if self._background is None or not canvas.supports_blit:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self._background)
+        self._draw_animated()
+        canvas.blit(self.ax.bbox)
+
+    def _update_legend(self):
+        if self.legend is not None:
+            self.legend.remove()
         if self.sax is not None:
             # if a specific Axes was provided, we will draw the legend in it
             sax = self.sax
-            sax.axis('off')
             loc='upper left'
             offset=(0,1)
         else:
@@ -221,12 +662,77 @@ class BubbleChart:
             sax = self.ax
             loc='upper right'
             offset = (1,1)
-        self.legend = legend.make_size_legend(self.s, self.sizes, nstops=3, 
-                                              title=self.sname, spacing=1.5, 
-                                              log_scale=False, ax=sax, 
+        key = self._legend_cache_key()
+        if key != self._legend_key:
+            self._legend_entries = \
+                legend.size_legend_entries(self.s, self.sizes, nstops=3,
+                                           log_scale=False)
+            self._legend_key = key
+        self.legend = legend.draw_size_legend(*self._legend_entries,
+                                              title=self.sname, ax=sax, 
                                               facecolor=self.cmap(0.5),
                                               loc=loc, offset=offset)
-        self.fig.draw(self.fig._get_renderer())
+            
+    def _legend_cache_key(self):
+        return (id(self.s), self._s_version, self.scale, 
+                tuple(self.size_range))
+
+    def draw(self, redraw=True):
+        """
+        Bring the artists up to date with the data and request a redraw
+        of the canvas.
+
+        The scatter collection (or, above `aggregate_threshold` points,
+        the aggregate image), the colorbar and the size legend are 
+        created on the first call. Afterwards, only the channels that 
+        changed since the last call (through `set_data` or `update_sizes`)
+        are pushed to the existing artists. A change of `selected` (or a
+        call to `update_selection`) only rewrites the points whose 
+        selection state changed and, in blit mode, is rendered with 
+        `blit_update`.
+
+        Parameters
+        ----------
+        redraw : `bool`
+            If False, only the artists are updated and rendering them is
+            left to the caller, e.g., to redraw a canvas shared by several
+            charts once.
+
+        Returns
+        -------
+        True if `blit_update` is enough to render the changes.
+        """
+        if self.x is None or \
+           self.y is None or \
+           self.c is None or \
+           self.sizes is None:
+            raise ValueError('One of the attributes is not defined')
+
+        self.aggregated = self.x.shape[0] > self.aggregate_threshold
+        if self.blit and self.plot is not None and not self.aggregated \
+           and not self._stale:
+            # only the selection can have changed
+            self._update_plot()
+            if redraw:
+                self.blit_update()
+            return True
+
+        self._update_scales()
+        if self.colorbar is None:
+            self._create_colorbar()
+        if self.aggregated:
+            self._update_image()
+        else:
+            self._update_plot()
+            if self.legend is None or 's' in self._stale:
+                self._update_legend()
+
+        self.ax.set_xlabel(self.xname, weight='bold')
+        self.ax.set_ylabel(self.yname, weight='bold')
+        self._stale.clear()
+        if redraw:
+            self.fig.canvas.draw_idle()
+        return False
 
 class interaction:
     def __init__(self, chart):
@@ -236,10 +742,18 @@ class interaction:
         chart.selected = selected 
         chart.draw()
 
+    def update_delta(self, added, removed):
+        chart.update_selection(added, removed)
+        chart.draw()
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Demonstrate bubble chart')
     parser.add_argument('-n', '--number', type=int, default=100, help='Number of data points')
     parser.add_argument('--brush', action='store_true', help='Activate brush selector')
+    parser.add_argument('--live', action='store_true', help='Update the selection while brushing')
+    parser.add_argument('--blit', action='store_true', help='Use blitting to render selections')
+    parser.add_argument('--linked', action='store_true', help='Add a second chart of the same points, linked to the first one')
+    parser.add_argument('--aggregate-threshold', type=int, default=1_000_000, help='Number of data points above which the chart shows an aggregate image')
     args = parser.parse_args()
     
     x = np.random.rand(args.number)
@@ -247,12 +761,44 @@ if __name__ == '__main__':
     c = np.random.rand(args.number)
     s = np.random.rand(args.number)
 
-    chart = BubbleChart(x=x, y=y, s=s, c=c, xname='x', yname='y', 
-                        sname='size', cname='colors', fig=None)
+    source = DataSource(x=x, y=y, s=s, c=c)
+    chart = BubbleChart(source=source, xname='x', yname='y', 
+                        sname='size', cname='colors', fig=None, 
+                        blit=args.blit, 
+                        aggregate_threshold=args.aggregate_threshold)
 
     inter = interaction(chart)
+    charts = [ chart ]
+    if args.linked:
+        # the same rows with the channels swapped, in another window
+        charts.append(BubbleChart(source=source, 
+                                  columns={ 'x': 'c', 'y': 's', 
+                                            's': 'y', 'c': 'x' },
+                                  xname='colors', yname='size', 
+                                  sname='y', cname='x', blit=args.blit,
+                                  aggregate_threshold=args.aggregate_threshold))
+        coordinator = SelectionCoordinator(source)
+        for a_chart in charts:
+            coordinator.add_view(a_chart)
+        inter.update = coordinator.select
+        inter.update_delta = coordinator.update
 
     if args.brush:
-        brush = Brush(x, y, chart.ax, inter.update, color='blue')
-    chart.draw()
+        brushes = []
+        for a_chart in charts:
+            xcol, ycol = a_chart.columns['x'], a_chart.columns['y']
+            if args.live:
+                brush = Brush(None, None, a_chart.ax, None, color='blue', 
+                              useblit=args.blit, source=source, 
+                              columns=(xcol, ycol),
+                              on_change=inter.update_delta)
+            else:
+                brush = Brush(None, None, a_chart.ax, inter.update, 
+                              color='blue', useblit=args.blit, 
+                              source=source, columns=(xcol, ycol))
+            if args.linked:
+                coordinator.add_brush(brush)
+            brushes.append(brush)
+    for a_chart in charts:
+        a_chart.draw()
     plt.show()
\ No newline at end of file
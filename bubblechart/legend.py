@@ -5,82 +5,130 @@ import sys
 import json
 import numpy as np
 import math
-from scipy.interpolate import make_interp_spline
 
 verbose = False
 
 def n_orders(_min, _max):
-    if _min < 0:
+    if _min <= 0:
         return 0, 0
     if verbose: print(f'min={_min}, max={_max}')
     mino = int(math.log10(_min))
     maxo = int(math.log10(_max))
     return mino, maxo
 
-def legend_helper(values, sizes, nstops=4, log_scale=True):
-    if verbose:
-        print(f'values=\n{values}')
-        print(f'sizes=\n{sizes}')
-    uvals, unique_indices = np.unique(values, return_index=True)
-        
-    usizes = [ sizes[i] for i in unique_indices]
-
-    all_vals = np.array([uvals, usizes]).transpose()
-    all_vals = np.sort(all_vals, axis=0)
-
-    val_to_size = make_interp_spline(all_vals[:, 0], all_vals[:, 1])
-    minv = np.min(values)
-    maxv = np.max(values)
-    min_order, max_order = n_orders(minv, maxv)
-    val_range = maxv-minv
-    vstops = []
-    sstops = []
-    if min_order == 0 and max_order == 0:
-        log_scale = False
-    if not log_scale:
-        dv = val_range/(nstops-1)
-        v = minv
-        for i in range(nstops):
-            if v > 10:
-                vstops.append(int(v))
-            else:
-                vstops.append(v)
-            sstops.append(float(val_to_size(v)))
-            v += dv
+# mantissas of the "nice" steps between legend stops
+nice_mantissas = [ 1, 2, 2.5, 5 ]
+
+def nice_steps(raw):
+    """
+    The nice steps (1, 2, 2.5 or 5 times a power of 10), decreasing from
+    the power of 10 above `raw`.
+    """
+    exponent = math.floor(math.log10(raw)) + 1
+    yield 10**exponent
+    while True:
+        exponent -= 1
+        for m in reversed(nice_mantissas):
+            yield m * 10**exponent
+
+def linear_stops(vmin, vmax, nstops):
+    """
+    Between 2 and `nstops` round values within [vmin, vmax], evenly spaced
+    by a nice step (or the bounds themselves if there is no such step), or
+    only vmin if the range is empty.
+    """
+    if vmax <= vmin:
+        return [ vmin ]
+    # a step >= range/(nstops-1) yields at most nstops stops: smaller and
+    # smaller steps are tried until one yields more than nstops, keeping
+    # the last one that yields at least 2
+    stops = None
+    for step in nice_steps((vmax-vmin)/(nstops-1)):
+        first = math.ceil(vmin/step)
+        last = math.floor(vmax/step)
+        if last - first + 1 > nstops:
+            break
+        if last > first:
+            digits = max(0, -math.floor(math.log10(step)) + 1)
+            stops = [ round(i*step, digits) for i in range(first, last+1) ]
+    return stops if stops is not None else [ vmin, vmax ]
+
+def log_stops(vmin, vmax, nstops):
+    """
+    Between 2 and `nstops` powers of 10 within [vmin, vmax], evenly spaced
+    in log scale, or None if the range does not contain two of them.
+    """
+    if vmin <= 0:
+        return None
+    first = math.ceil(math.log10(vmin))
+    last = math.floor(math.log10(vmax))
+    if last <= first:
+        return None
+    do = math.ceil((last-first)/(nstops-1))
+    return [ math.pow(10, o) for o in range(first, last+1, do) ]
+
+def range_stops(vmin, vmax, smin, smax, nstops=4, log_scale=True):
+    """
+    Compute the value and size stops of a size legend directly from the
+    range of the values and that of the sizes they are mapped to, 
+    assuming an affine mapping (see `linscale`).
+    """
+    vstops = None
+    if log_scale:
+        vstops = log_stops(vmin, vmax, nstops)
+    if vstops is None:
+        vstops = linear_stops(vmin, vmax, nstops)
+    if vmax > vmin:
+        sstops = [ smin + (v-vmin)/(vmax-vmin)*(smax-smin) for v in vstops ]
     else:
-        do = (max_order - min_order) // (nstops-1)
-        ord = min_order 
-        for i in range(nstops):
-            vstops.append(math.pow(10, ord))
-            ord += do
-            sstops.append(val_to_size(vstops[-1]))
-    
+        sstops = [ smax for v in vstops ]
+    # whole stops are shown without a fractional part
+    vstops = [ int(v) if v == int(v) else v for v in vstops ]
     if verbose:
         print(f'value stops: {vstops}')
         print(f'size stops: {sstops}')
     return vstops, sstops
 
+def legend_helper(values, sizes, nstops=4, log_scale=True):
+    if verbose:
+        print(f'values=\n{values}')
+        print(f'sizes=\n{sizes}')
+    return range_stops(float(np.min(values)), float(np.max(values)),
+                       float(np.min(sizes)), float(np.max(sizes)),
+                       nstops, log_scale=log_scale)
+
 def make_size_text(stops):
     labels = []
     if verbose: print(f'size_text: stops are {stops}')
+    if len(stops) < 2:
+        # a single stop, when all the values are equal
+        return [ f'{s:g}' for s in stops ]
     mino, maxo = n_orders(stops[0], stops[1])
     if mino >= 0 and maxo <= 4:
         labels= [ f'{s}' for s in stops ]
         for i, l in enumerate(labels):
-            if len(l) > 4:
+            # long fractional stops are rounded, whole ones kept as is
+            if len(l) > 4 and not isinstance(stops[i], int):
                 labels[i] = f'{stops[i]:.1f}'
         return labels
     else:
         return [ f'{s:.1e}' for s in stops ]
 
-def make_size_legend(values, sizes, nstops, shape='o', title='None',        
-                     log_scale=True, spacing=0.5, ax=None, facecolor='white',
-                     edgecolor='black', loc='upper right', offset=(1, 1),
-                     show_frame=False):
+def size_legend_entries(values, sizes, nstops, log_scale=True):
+    """
+    Compute the entries of a size legend: the label of each stop and the
+    size (area in points^2) of its marker.
+    """
     value_stops, size_stops = legend_helper(values, sizes, nstops, 
                                             log_scale=log_scale)
-    size_text = make_size_text(value_stops)
-    size_values = size_stops
+    return make_size_text(value_stops), size_stops
+
+def draw_size_legend(size_text, size_values, shape='o', title='None',
+                     ax=None, facecolor='white', edgecolor='black', 
+                     loc='upper right', offset=(1, 1), show_frame=False):
+    """
+    Draw a size legend from precomputed entries (see `size_legend_entries`)
+    """
     if verbose:
         print(f'sizes are {size_values}')
         print(f'size text is {size_text}')
@@ -91,7 +139,7 @@ def make_size_legend(values, sizes, nstops, shape='o', title='None',
                        for s in size_values ]
     heights = np.sqrt(size_values)
     # spacing will be multiplied by fontsize = 10
-    dist = 0.5*(heights[-2] + heights[-1])
+    dist = 0.5*(heights[-2] + heights[-1]) if len(heights) > 1 else heights[-1]
     spacing = 0.8*(dist)/10
 
     if ax is None:
@@ -106,6 +154,16 @@ def make_size_legend(values, sizes, nstops, shape='o', title='None',
                          labelspacing=spacing, frameon=show_frame)
     return size_legend
 
+def make_size_legend(values, sizes, nstops, shape='o', title='None',        
+                     log_scale=True, spacing=0.5, ax=None, facecolor='white',
+                     edgecolor='black', loc='upper right', offset=(1, 1),
+                     show_frame=False):
+    size_text, size_values = size_legend_entries(values, sizes, nstops,
+                                                 log_scale=log_scale)
+    return draw_size_legend(size_text, size_values, shape=shape, title=title,
+                            ax=ax, facecolor=facecolor, edgecolor=edgecolor,
+                            loc=loc, offset=offset, show_frame=show_frame)
+
 if __name__ == '__main__':
     data = np.random.random((100, 4))
     sizes = 500*data[:,2]
@@ -8,6 +8,7 @@ import sys
 sys.path.append('../interaction')
 
 from brush import Brush
+from datasource import DataSource
 
 import legend
 from random import Random
@@ -23,6 +24,24 @@ from PyQt6.QtWidgets import QGridLayout, QPushButton, QComboBox, QSlider, QLabel
 from numpy.typing import ArrayLike
 from bubble_chart import BubbleChart
 
+class WorkerSignals(QtCore.QObject):
+    # emitted from the worker thread, delivered on the GUI thread
+    finished = QtCore.pyqtSignal(object)
+
+class Worker(QtCore.QRunnable):
+    def __init__(self, fn, *args):
+        """
+        Runs fn(*args) in a thread of a `QThreadPool` and emits its result
+        with `signals.finished`.
+        """
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.signals = WorkerSignals()
+
+    def run(self):
+        self.signals.finished.emit(self.fn(*self.args))
+
 class ApplicationWindow(QtWidgets.QMainWindow):
     def __init__(self, args):
         super().__init__()
@@ -31,6 +50,14 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         layout = QtWidgets.QGridLayout(self.main_widget)
         self.width = 1
         self.npoints = args.number
+        # Data is prepared in worker threads. Every request for a channel
+        # gets a new generation number and only the result of the latest
+        # one is applied, older ones being dropped. Results applied in the
+        # same turn of the event loop share one redraw.
+        self.pool = QtCore.QThreadPool.globalInstance()
+        self.workers = set()
+        self.generations = {}
+        self.redraw_pending = False
 
         x = np.random.rand(self.npoints)
         y = np.random.rand(self.npoints)
@@ -39,13 +66,22 @@ class ApplicationWindow(QtWidgets.QMainWindow):
 
         self.mpl_canvas = FigureCanvas(Figure(figsize=(8, 8)))
 
-        self.chart = BubbleChart(x=x, y=y, s=s, c=c, xname='x', yname='y', 
+        # the chart and the brush share the columns of the data source
+        self.source = DataSource(x=x, y=y, s=s, c=c)
+        self.chart = BubbleChart(source=self.source, xname='x', yname='y', 
                                  sname='size', cname='colors', 
-                                 fig=self.mpl_canvas.figure, cmap=args.colormap)
+                                 fig=self.mpl_canvas.figure, cmap=args.colormap,
+                                 blit=args.blit,
+                                 aggregate_threshold=args.aggregate_threshold)
 
         if args.brush:
-            self.brush = Brush(x, y, self.chart.ax, self.update_selection, 
-                               color='blue')
+            # in live mode, the selection follows the brush while dragging
+            self.brush = Brush(None, None, self.chart.ax, 
+                               None if args.live else self.update_selection,
+                               color='blue', useblit=args.blit, 
+                               source=self.source, 
+                               on_change=self.update_selection_delta 
+                                         if args.live else None)
         else: self.brush = None
 
         self.toolbar = NavigationToolbar(self.mpl_canvas, self)
@@ -67,6 +103,8 @@ class ApplicationWindow(QtWidgets.QMainWindow):
 
         self.fig = self.chart.fig 
         self.ax = self.chart.ax 
+        # the scale the size buttons lead to, once their requests are done
+        self.target_scale = self.chart.scale
         self.chart.draw()
 
         self.button_x.clicked.connect(self.update_x)
@@ -77,53 +115,97 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         self.button_d.clicked.connect(self.update_d)
 
     def redraw(self):
+        # the chart only updates the artists that changed and schedules
+        # the canvas redraw itself, once for all the updates made until
+        # the event loop gets back to the timer
+        if not self.redraw_pending:
+            self.redraw_pending = True
+            QtCore.QTimer.singleShot(0, self._flush)
+
+    def _flush(self):
+        self.redraw_pending = False
         self.chart.draw()
-        self.mpl_canvas.draw()
+
+    def submit(self, key, prepare, apply, *args):
+        """
+        Run prepare(*args) in a worker thread, then apply(result) on the
+        GUI thread unless a later request was submitted with the same key.
+        """
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+        worker = Worker(prepare, *args)
+        def finished(result):
+            self.workers.discard(worker)
+            if self.generations[key] == generation:
+                apply(result)
+                self.redraw()
+        worker.signals.finished.connect(finished)
+        # keep the worker (and its signals) alive until it is done
+        self.workers.add(worker)
+        self.pool.start(worker)
+
+    def random_data(self):
+        return np.random.default_rng().random(self.npoints)
 
     def update_x(self):
-        x = np.random.rand(self.npoints)
-        self.chart.set_data('x', x, 'x')
-        if self.brush is not None:
-            self.brush.update_coords(xs=x)
-        self.redraw()
+        self.submit('x', self.random_data, 
+                    lambda x: self.chart.set_data('x', x, 'x'))
 
     def update_y(self):
-        y = np.random.rand(self.npoints)
-        self.chart.set_data('y', y, 'y')
-        if self.brush is not None:
-            self.brush.update_coords(ys=y)
-        self.redraw()
+        self.submit('y', self.random_data, 
+                    lambda y: self.chart.set_data('y', y, 'y'))
 
     def update_s(self):
-        s = np.random.rand(self.npoints)
-        self.chart.set_data('s', s, 'sizes')
-        self.redraw()
+        # the sizes and the size legend are computed in the worker too,
+        # at the scale expected once every pending request is done
+        def prepare(scale):
+            return self.chart.prepare_sizes(self.random_data(), scale)
+        def apply(prepared):
+            self.chart.set_data('s', prepared[0], 'sizes', prepared=prepared)
+        self.submit('s', prepare, apply, self.target_scale)
 
     def update_c(self):
-        c = np.random.rand(self.npoints)
-        self.chart.set_data('c', c, 'colors')
-        self.redraw()
+        self.submit('c', self.random_data, 
+                    lambda c: self.chart.set_data('c', c, 'colors'))
+
+    def rescale(self, factor):
+        self.target_scale *= factor
+        def apply(prepared):
+            # sizes prepared for an s replaced since then are computed
+            # again by the chart
+            self.chart.scale = prepared[1]
+            self.chart.update_sizes(prepared)
+        self.submit('scale', self.chart.prepare_sizes, apply, 
+                    self.chart.s, self.target_scale)
 
     def update_i(self):
-        self.chart.scale = self.chart.scale * 1.5
-        self.chart.update_sizes()
-        self.redraw()
+        self.rescale(1.5)
 
     def update_d(self):
-        self.chart.scale = self.chart.scale / 1.5
-        self.chart.update_sizes()
-        self.redraw()
+        self.rescale(1/1.5)
 
     def update_selection(self, selected):
+        # in blit mode, the chart only blits the data over its background
         self.chart.selected = selected 
         self.redraw()
 
+    def update_selection_delta(self, added, removed):
+        self.chart.update_selection(added, removed)
+        self.redraw()
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Demonstrate bubble chart')
     parser.add_argument('-n', '--number', type=int, default=100, 
                         help='Number of data points')
     parser.add_argument('--brush', action='store_true', 
                         help='Activate brush selector')
+    parser.add_argument('--live', action='store_true', 
+                        help='Update the selection while brushing')
+    parser.add_argument('--blit', action='store_true', 
+                        help='Use blitting to render selections')
+    parser.add_argument('--aggregate-threshold', type=int, default=1_000_000,
+                        help='Number of data points above which the chart '
+                             'shows an aggregate image')
     parser.add_argument('-c', '--colormap', type=str, default='plasma', 
                         help='Colormap to use')
     args = parser.parse_args()
@@ -0,0 +1,93 @@
+import numpy as np
+from matplotlib.collections import PathCollection
+from matplotlib.markers import MarkerStyle
+from matplotlib.transforms import IdentityTransform
+
+class ViewportCollection(PathCollection):
+    def __init__(self, before_draw=None, marker='o', **kwargs):
+        """
+        A scatter collection whose owner gets a chance to update its
+        content (e.g., to cull it to the current view) right before it
+        is drawn.
+
+        Parameters
+        ----------
+        before_draw : callable
+            Called without arguments at the beginning of every draw.
+
+        marker : `str`
+            The marker used for every point.
+
+        **kwargs
+            Passed on to `~matplotlib.collections.PathCollection`.
+        """
+        marker = MarkerStyle(marker)
+        path = marker.get_path().transformed(marker.get_transform())
+        super().__init__((path,), **kwargs)
+        # the marker paths and sizes are in points, as in `Axes.scatter`
+        self.set_transform(IdentityTransform())
+        self.before_draw = before_draw
+
+    def draw(self, renderer):
+        if self.before_draw is not None:
+            self.before_draw()
+        super().draw(renderer)
+
+def points_in_view(x, y, xlim, ylim, margin=(0, 0)):
+    """
+    Indices of the points inside the given limits, extended on every side
+    by the given (x, y) margin.
+    """
+    xmin, xmax = sorted(xlim)
+    ymin, ymax = sorted(ylim)
+    mx, my = margin
+    inside = (x >= xmin-mx) & (x <= xmax+mx) & (y >= ymin-my) & (y <= ymax+my)
+    return np.flatnonzero(inside)
+
+def priority(points):
+    """
+    A fixed pseudo-random priority for each point index, so that sampling
+    keeps the same points from one view to the next.
+    """
+    # Knuth's multiplicative hash
+    return (points.astype(np.uint64) * np.uint64(2654435761)) % (1 << 32)
+
+def stratified_sample(x, y, points, xlim, ylim, budget, cells=32):
+    """
+    Deterministically pick at most `budget` of the given points, spread
+    across a grid of cells x cells over the given limits.
+
+    Every occupied cell keeps the same number of points (or all of its
+    points if it has fewer), chosen by their `priority`, so that sparse
+    regions do not disappear next to dense ones.
+
+    Returns the sorted indices of the picked points.
+    """
+    if points.shape[0] <= budget:
+        return points
+    xmin, xmax = sorted(xlim)
+    ymin, ymax = sorted(ylim)
+    ix = np.clip(((x[points]-xmin) * (cells/(xmax-xmin))).astype(np.intp),
+                 0, cells-1)
+    iy = np.clip(((y[points]-ymin) * (cells/(ymax-ymin))).astype(np.intp),
+                 0, cells-1)
+    cell = (iy*cells + ix).astype(np.uint64)
+    # sort by cell, then by priority within each cell
+    order = np.argsort((cell << np.uint64(32)) | priority(points))
+    cell = cell[order]
+    counts = np.bincount(cell.astype(np.intp), minlength=cells*cells)
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(points.shape[0]) - starts[cell.astype(np.intp)]
+    # largest quota per cell that fits within the budget
+    occupied = counts[counts > 0]
+    lo, hi = 0, int(occupied.max())
+    while lo < hi:
+        q = (lo + hi + 1) // 2
+        if np.minimum(occupied, q).sum() <= budget:
+            lo = q
+        else:
+            hi = q - 1
+    if lo == 0:
+        # fewer points than occupied cells: fall back to the priorities
+        return np.sort(points[np.argsort(priority(points))[:budget]])
+    return np.sort(points[order[rank < lo]])
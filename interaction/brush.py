@@ -1,37 +1,212 @@
 import matplotlib as mpl
 from matplotlib.widgets import RectangleSelector
-import pandas as pd
 from matplotlib import pyplot as plt
 import typing
 from numpy.typing import ArrayLike
 import numpy as np
+import time
+
+from spatial_index import GridIndex, rectangle_difference
+from datasource import DataSource
+from selection import Selection
 
 class Brush:
     def __init__(self, xs: ArrayLike, ys: ArrayLike, ax: mpl.axes.Axes, cb,
-                 color='red', alpha=0.6, edgecolor='black'):
-        self.df = pd.DataFrame()
-        self.df['x'] = xs
-        self.df['y'] = ys
+                 color='red', alpha=0.6, edgecolor='black', useblit=False,
+                 source: DataSource | None = None, columns=('x', 'y'),
+                 on_change=None, rate=60):
+        # The coordinates are read from the `columns` of a data source. 
+        # When one is shared with a chart, xs and ys can be None and the 
+        # brush follows the changes of the coordinates by itself.
+        self.columns = columns
+        if source is None:
+            source = DataSource(**{ columns[0]: xs, columns[1]: ys })
+        self.source = source
+        self.source.subscribe(self._on_source_changed)
+        self.index = GridIndex(self.source[columns[0]], 
+                               self.source[columns[1]])
+        # cb receives the new `Selection` on release. By default, the
+        # rectangle replaces the selection; with shift, it is added to the
+        # selection and with control, it is subtracted from it.
         self.cb = cb
+        self.selection = Selection(len(self.source))
         self.ax = ax
+        # Live mode: while dragging, on_change receives the (sorted) 
+        # indices of the points added to and removed from the selection
+        # since its previous call, at most `rate` times per second.
+        self.on_change = on_change
+        self.interval = 1 / rate
+        # mode and starting selection of the current drag, and rectangle 
+        # whose selection on_change last reported
+        self._mode = 'replace'
+        self._base = self.selection
+        self._previous = None
+        self._dragging = False
+        self._last_update = 0
         props = dict(facecolor=color, edgecolor=edgecolor, alpha=alpha, 
                      fill=True)
-        self.rec = RectangleSelector(ax, self.callback, props=props)
+        # with blitting, the selector only redraws its rectangle (and the
+        # other animated artists of the Axes) while dragging. Shift and
+        # control select the mode, so alt makes the rectangle a square 
+        # and super (the Windows or command key) centers it on the first 
+        # click. Modifiers are single keys: the selector matches each of
+        # them against the parts of the key of an event.
+        self.rec = RectangleSelector(ax, self.callback, props=props,
+                                     useblit=useblit,
+                                     state_modifier_keys=dict(square='alt',
+                                                              center='super'))
+        canvas = ax.figure.canvas
+        canvas.mpl_connect('button_press_event', self._on_press)
+        # connected after the selector, so that its callback comes first
+        canvas.mpl_connect('button_release_event', self._on_release)
+        if on_change is not None:
+            canvas.mpl_connect('motion_notify_event', self._on_move)
+            # trailing update for the last moves of a burst
+            self._timer = canvas.new_timer(interval=int(1000*self.interval))
+            self._timer.single_shot = True
+            self._timer.add_callback(self._flush)
 
     def update_coords(self, xs: ArrayLike | None = None, 
                       ys: ArrayLike | None = None):
-        if xs is not None:
-            self.df['x'] = xs 
-        if ys is not None:
-            self.df['y'] = ys
+        self.source.update(**{ self.columns[0]: xs, self.columns[1]: ys })
+
+    def _on_source_changed(self, names):
+        xcol, ycol = self.columns
+        if len(self.source) != self.selection.n:
+            self.selection = Selection(len(self.source))
+        if not names & { xcol, ycol }:
+            return
+        held = None
+        if self.on_change is not None and self._dragging \
+           and self._previous is not None:
+            # the points in the rectangle change with the coordinates
+            held = self.index.query(*self._previous)
+        self.index.update(xs=self.source[xcol] if xcol in names else None,
+                          ys=self.source[ycol] if ycol in names else None)
+        if held is not None:
+            now = self.index.query(*self._previous)
+            self._report(np.setdiff1d(now, held, assume_unique=True),
+                         np.setdiff1d(held, now, assume_unique=True))
+
+    def _get_mode(self, event):
+        key = event.key or ''
+        if 'shift' in key:
+            return 'add'
+        if key == 'control':
+            return 'subtract'
+        return 'replace'
+
+    def _on_press(self, event):
+        self._dragging = not self.rec.ignore(event)
+        if not self._dragging:
+            return
+        self._mode = self._get_mode(event)
+        self._base = self.selection.copy()
+        self._previous = None
+        if self.on_change is not None and self._mode == 'replace' \
+           and len(self._base) > 0:
+            # the new rectangle replaces the selection, starting empty
+            self.on_change(np.empty(0, dtype=np.intp), 
+                           np.asarray(self._base))
+
+    def _on_release(self, event):
+        # a release the selector does not report (e.g., a click without a 
+        # drag) leaves the selection as it was: the changes reported while
+        # dragging are undone
+        if not self._dragging:
+            return
+        self._dragging = False
+        if self.on_change is None:
+            return
+        self._timer.stop()
+        shown = Selection(self.selection.n)
+        if self._previous is not None:
+            shown = Selection(self.selection.n, 
+                              self.index.query(*self._previous))
+        shown = self._combine(shown)
+        added = np.asarray(self._base - shown)
+        removed = np.asarray(shown - self._base)
+        if added.shape[0] > 0 or removed.shape[0] > 0:
+            self.on_change(added, removed)
+
+    def _on_move(self, event):
+        if not self._dragging:
+            return
+        if time.perf_counter() - self._last_update >= self.interval:
+            self._flush()
+        else:
+            self._timer.start()
+
+    def _flush(self):
+        self._timer.stop()
+        if self._dragging:
+            self._last_update = time.perf_counter()
+            self._update(*self.rec.extents)
+
+    def _update(self, x1, x2, y1, y2):
+        # report the points that entered and left the rectangle since the
+        # previous one: only the parts of either rectangle outside of the
+        # other one are queried
+        rect = (min(x1, x2), max(x1, x2), min(y1, y2), max(y1, y2))
+        previous = self._previous
+        if rect == previous:
+            return
+        self._previous = rect
+        if previous is None:
+            self._report(self.index.query(*rect), np.empty(0, dtype=np.intp))
+        else:
+            self._report(self._difference(rect, previous),
+                         self._difference(previous, rect))
+
+    def _difference(self, a, b):
+        # indices of the points in rectangle a but not in rectangle b
+        pieces = rectangle_difference(a, b)
+        if not pieces:
+            return np.empty(0, dtype=np.intp)
+        points = np.unique(np.concatenate([ self.index.query(*p) 
+                                            for p in pieces ]))
+        bx1, bx2, by1, by2 = b
+        xs, ys = self.index.x[points], self.index.y[points]
+        in_b = (xs >= bx1) & (xs <= bx2) & (ys >= by1) & (ys <= by2)
+        return points[~in_b]
+
+    def _report(self, entered, left):
+        # turn the points that entered and left the rectangle into changes
+        # of the selection, depending on the mode
+        if self._mode == 'add':
+            added = entered[~self._base.contains(entered)]
+            removed = left[~self._base.contains(left)]
+        elif self._mode == 'subtract':
+            added = left[self._base.contains(left)]
+            removed = entered[self._base.contains(entered)]
+        else:
+            added, removed = entered, left
+        if added.shape[0] > 0 or removed.shape[0] > 0:
+            self.on_change(added, removed)
+
+    def _combine(self, rect):
+        # the selection resulting from the given rectangle in this mode
+        if self._mode == 'add':
+            return self._base | rect
+        if self._mode == 'subtract':
+            return self._base - rect
+        return rect
 
     def callback(self, eclick, erelease):
         x1, y1 = eclick.xdata, eclick.ydata
         x2, y2 = erelease.xdata, erelease.ydata
-        selected = \
-            self.df[ self.df['x'].between(x1, x2, inclusive='both') & 
-                     self.df['y'].between(y1, y2, inclusive='both') ]
-        self.cb(selected.index.tolist())
+        if not self._dragging:
+            # e.g., the selector was driven programmatically
+            self._mode = self._get_mode(eclick)
+            self._base = self.selection.copy()
+        if self.on_change is not None:
+            self._timer.stop()
+            self._update(x1, x2, y1, y2)
+        self._dragging = False
+        rect = Selection(self.selection.n, self.index.query(x1, x2, y1, y2))
+        self.selection = self._combine(rect)
+        if self.cb is not None:
+            self.cb(self.selection)
 
 class interaction:
     def __init__(self):
@@ -45,7 +220,7 @@ class interaction:
         plt.show()
     
     def update(self, selected):
-        if not selected:
+        if len(selected) == 0:
             self.plot = self.ax.scatter(self.x, self.y, c=self.c, s=self.s)
         else:
             mask = np.ones(100, dtype=bool)
@@ -0,0 +1,120 @@
+import os
+import numpy as np
+from numpy.typing import ArrayLike
+
+class DataSource:
+    def __init__(self, **columns: ArrayLike):
+        """
+        Named columns of data shared by several views (e.g., a chart and
+        the brush that selects its points).
+
+        The columns are kept as NumPy arrays, without copying the arrays
+        that are given. Views read them from the source instead of
+        keeping their own copies and subscribe to it to be told when
+        columns are replaced.
+
+        Parameters
+        ----------
+        **columns : `ArrayLike`
+            The initial columns, by name. Columns given as None are
+            ignored.
+        """
+        self.columns = {}
+        self._subscribers = []
+        self._set(columns)
+
+    def _set(self, columns):
+        changed = set()
+        for name, values in columns.items():
+            if values is None:
+                continue
+            self.columns[name] = np.asarray(values)
+            changed.add(name)
+        return changed
+
+    def update(self, **columns: ArrayLike):
+        """
+        Replace the given columns and notify the subscribers once,
+        with the names of all of them.
+        """
+        changed = self._set(columns)
+        if not changed:
+            return
+        for callback in list(self._subscribers):
+            callback(changed)
+
+    def subscribe(self, callback):
+        """
+        Call `callback` with the set of the names of the changed columns
+        after every `update`.
+        """
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def get(self, name: str, default=None):
+        return self.columns.get(name, default)
+
+    def __getitem__(self, name: str):
+        return self.columns[name]
+
+    def __setitem__(self, name: str, values: ArrayLike):
+        self.update(**{ name: values })
+
+    def __contains__(self, name: str):
+        return name in self.columns
+
+    def __len__(self):
+        for values in self.columns.values():
+            return values.shape[0]
+        return 0
+
+class PointStore(DataSource):
+    columns_on_disk = ( 'x', 'y', 'state' )
+
+    def __init__(self, x: ArrayLike, y: ArrayLike, 
+                 state: ArrayLike | None = None):
+        """
+        2D points stored as contiguous arrays (a data source with 'x', 
+        'y' and 'state' columns), e.g., for the interaction tools.
+
+        Parameters
+        ----------
+        x, y : `ArrayLike`
+            The coordinates of the points.
+
+        state : `ArrayLike`
+            One byte per point (e.g., 1 if the point is selected, 0 
+            otherwise). All zeros if None is provided.
+        """
+        if state is None:
+            state = np.zeros(np.shape(x)[0], dtype=np.uint8)
+        super().__init__(x=x, y=y, state=state)
+
+    @classmethod
+    def random(cls, n: int, seed=None):
+        """
+        n points uniformly distributed in the unit square.
+        """
+        rng = np.random.default_rng(seed)
+        return cls(rng.random(n), rng.random(n))
+
+    def save(self, path: str):
+        """
+        Save the columns as .npy files in the directory `path`.
+        """
+        os.makedirs(path, exist_ok=True)
+        for name in self.columns_on_disk:
+            np.save(os.path.join(path, f'{name}.npy'), self[name])
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str | None = 'r'):
+        """
+        Load points saved with `save`. By default, the columns are memory
+        mapped (read-only) rather than read into memory.
+        """
+        columns = [ np.load(os.path.join(path, f'{name}.npy'), 
+                            mmap_mode=mmap_mode)
+                    for name in cls.columns_on_disk ]
+        return cls(*columns)
@@ -4,51 +4,69 @@ import matplotlib.pyplot as plt
 from matplotlib.widgets import Lasso
 import numpy as np
 
+from selection import Selection
+from spatial_index import GridIndex
+from datasource import PointStore
 
-class Datum:
+
+class LassoManager:
     colorin = mcolors.to_rgba("red")
     colorout = mcolors.to_rgba("blue")
 
-    def __init__(self, x, y, include=False):
-        self.x = x
-        self.y = y
-        if include:
-            self.color = self.colorin
-        else:
-            self.color = self.colorout
-
-
-class LassoManager:
-    def __init__(self, ax, data):
+    def __init__(self, ax, data: PointStore, cb=None):
         self.axes = ax
         self.canvas = ax.figure.canvas
+        # the points, whose 'state' tells which ones are (initially) in
         self.data = data
+        # cb receives the `Selection` of the lassoed points
+        self.cb = cb
 
         self.Nxy = len(data)
-
-        facecolors = [d.color for d in data]
-        self.xys = [(d.x, d.y) for d in data]
+        self.x, self.y = data['x'], data['y']
+        inside = data['state'] != 0
+        self.selection = Selection(self.Nxy, inside)
+        facecolors = np.where(inside[:, np.newaxis], self.colorin, 
+                              self.colorout)
+        # only the points in the bounding box of a lasso are tested
+        self.index = GridIndex(self.x, self.y)
         self.collection = RegularPolyCollection(
             12, sizes=(100,),
             facecolors=facecolors,
-            offsets=self.xys,
+            offsets=np.column_stack([self.x, self.y]),
             transOffset=ax.transData)
 
         ax.add_collection(self.collection)
+        # settle the colors now: the first draw would otherwise reset 
+        # them to the ones given at creation
+        self.collection.update_scalarmappable()
 
         self.cid = self.canvas.mpl_connect('button_press_event', self.on_press)
 
-    def callback(self, verts):
+    def set_selection(self, selection: Selection):
+        # only the points whose state changed are recolored, in place
         facecolors = self.collection.get_facecolors()
-        p = path.Path(verts)
-        ind = p.contains_points(self.xys)
-        for i in range(len(self.xys)):
-            if ind[i]:
-                facecolors[i] = Datum.colorin
-            else:
-                facecolors[i] = Datum.colorout
-
+        added = np.asarray(selection - self.selection)
+        removed = np.asarray(self.selection - selection)
+        facecolors[added] = self.colorin
+        facecolors[removed] = self.colorout
+        self.collection.stale = True
+        self.selection = selection
+        state = self.data['state']
+        if state.flags.writeable:
+            state[added] = 1
+            state[removed] = 0
         self.canvas.draw_idle()
+
+    def callback(self, verts):
+        verts = np.asarray(verts)
+        (x1, y1), (x2, y2) = verts.min(axis=0), verts.max(axis=0)
+        candidates = self.index.query(x1, x2, y1, y2)
+        xys = np.column_stack([self.x[candidates], self.y[candidates]])
+        inside = path.Path(verts).contains_points(xys)
+        self.set_selection(Selection(self.Nxy, candidates[inside]))
+        if self.cb is not None:
+            self.cb(self.selection)
+
         self.canvas.widgetlock.release(self.lasso)
         del self.lasso
 
@@ -66,9 +84,7 @@ class LassoManager:
 
 if __name__ == '__main__':
 
-    np.random.seed(19680801)
-
-    data = [Datum(*xy) for xy in np.random.rand(100, 2)]
+    data = PointStore.random(100, seed=19680801)
     ax = plt.axes(xlim=(0, 1), ylim=(0, 1), autoscale_on=False)
     ax.set_title('Lasso points using left mouse button')
 
@@ -7,6 +7,7 @@ from matplotlib.backends.backend_qtagg import FigureCanvas
 from matplotlib.backends.backend_qtagg import \
     NavigationToolbar2QT as NavigationToolbar
 from matplotlib.figure import Figure
+import matplotlib.transforms as mtransforms
 
 from PyQt6 import QtCore, QtGui, QtWidgets
 from PyQt6.QtWidgets import QGridLayout, QPushButton, QComboBox, QSlider, QLabel
@@ -51,27 +52,68 @@ class ApplicationWindow(QtWidgets.QMainWindow):
         layout.addWidget(self.slider,                              2, 5, 1, 1)
 
         self.ax = self.mpl_canvas.figure.subplots()
-        self.create_plot(data['Temperatures'])
+        # name -> the line of a dataset and the axis limits and labels
+        # showing it. Every dataset is plotted once, switching between
+        # them only changes which line is visible and the axis state.
+        self.views = {}
+        self.current = None
+        self.plots = None
+        self.show_data('Temperatures')
+        # the other datasets are plotted in the background, one per turn
+        # of the event loop
+        QtCore.QTimer.singleShot(0, self.prefetch)
 
         self.dropdown.activated.connect(self.update_data)
         self.slider.valueChanged.connect(self.update_width)
 
-    def create_plot(self, d):
-        self.plots = self.ax.plot(d['x'], d['y'], linewidth=self.width)
-        self.ax.set_xlabel(d['xlabel'])
-        self.ax.set_ylabel(d['ylabel'])
+    def create_plot(self, name):
+        d = data[name]
+        line, = self.ax.plot(d['x'], d['y'], 'C0', linewidth=self.width, 
+                             visible=False)
+        # the limits autoscaling would give for this line alone
+        bbox = mtransforms.Bbox.null()
+        bbox.update_from_data_xy(line.get_xydata())
+        self.ax.dataLim.set(bbox)
+        self.ax.set_autoscale_on(True)
+        self.ax.autoscale_view()
+        self.views[name] = { 'line': line, 
+                             'xlim': self.ax.get_xlim(), 
+                             'ylim': self.ax.get_ylim(),
+                             'xlabel': d['xlabel'], 'ylabel': d['ylabel'] }
+        if self.current is not None:
+            self.restore(self.views[self.current])
+        return self.views[name]
+
+    def restore(self, view):
+        self.ax.set_xlim(view['xlim'])
+        self.ax.set_ylim(view['ylim'])
+        self.ax.set_xlabel(view['xlabel'])
+        self.ax.set_ylabel(view['ylabel'])
+
+    def prefetch(self):
+        missing = [ name for name in data if name not in self.views ]
+        if missing:
+            self.create_plot(missing[0])
+            QtCore.QTimer.singleShot(0, self.prefetch)
+
+    def show_data(self, name):
+        if self.current is not None:
+            self.views[self.current]['line'].set_visible(False)
+        view = self.views.get(name) or self.create_plot(name)
+        self.current = name
+        view['line'].set_visible(True)
+        view['line'].set_linewidth(self.width)
+        self.restore(view)
+        self.plots = [ view['line'] ]
 
     def update_data(self, index):
-        name = self.dropdown.currentText()
-        self.ax.clear()
-        self.plots = self.create_plot(data[name])
-        self.mpl_canvas.draw()
+        self.show_data(self.dropdown.currentText())
+        self.mpl_canvas.draw_idle()
 
     def update_width(self, width):
         self.width = width
         self.plots[0].set_linewidth(width)
-        self.mpl_canvas.draw()
-
+        self.mpl_canvas.draw_idle()
 
 if __name__ == "__main__":
     # Check whether there is already a running QApplication (e.g., if running
@@ -0,0 +1,243 @@
+import numpy as np
+from numpy.typing import ArrayLike
+from matplotlib.backend_bases import TimerBase
+
+from datasource import DataSource
+
+class Selection:
+    def __init__(self, n: int, points: ArrayLike | None = None):
+        """
+        A set of points among `n`, stored as a packed bit array (one bit
+        per point, i.e., n/8 bytes whatever the number of selected 
+        points).
+
+        Selections combine with | (union), & (intersection), - 
+        (difference) and ~ (complement), and convert to the sorted array
+        of their indices with `numpy.asarray`.
+
+        Parameters
+        ----------
+        n : `int`
+            The number of points.
+
+        points : `ArrayLike`
+            The indices of the selected points, or a boolean mask of 
+            length n. Nothing is selected if None is provided.
+        """
+        self.n = n
+        if points is None:
+            self.bits = np.zeros((n+7) // 8, dtype=np.uint8)
+            return
+        points = np.asarray(points)
+        if points.dtype == bool:
+            mask = points
+        else:
+            mask = np.zeros(n, dtype=bool)
+            mask[points.astype(np.intp)] = True
+        self.bits = np.packbits(mask)
+
+    @classmethod
+    def _from_bits(cls, n, bits):
+        selection = cls.__new__(cls)
+        selection.n = n
+        selection.bits = bits
+        return selection
+
+    def mask(self):
+        """
+        The selection as a boolean array of length n.
+        """
+        return np.unpackbits(self.bits, count=self.n).astype(bool)
+
+    def indices(self):
+        """
+        The sorted indices of the selected points.
+        """
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.n))
+
+    def contains(self, points: ArrayLike):
+        """
+        Whether each of the given points is selected.
+        """
+        points = np.asarray(points, dtype=np.intp)
+        # packbits stores the first point in the highest bit of a byte
+        shifts = (7 - (points & 7)).astype(np.uint8)
+        return ((self.bits[points >> 3] >> shifts) & 1).astype(bool)
+
+    def add(self, points: ArrayLike):
+        """
+        Select the given points, in place.
+        """
+        points = np.asarray(points, dtype=np.intp)
+        np.bitwise_or.at(self.bits, points >> 3, 
+                         (128 >> (points & 7)).astype(np.uint8))
+
+    def remove(self, points: ArrayLike):
+        """
+        Deselect the given points, in place.
+        """
+        points = np.asarray(points, dtype=np.intp)
+        np.bitwise_and.at(self.bits, points >> 3,
+                          ~(128 >> (points & 7)).astype(np.uint8))
+
+    def copy(self):
+        return self._from_bits(self.n, self.bits.copy())
+
+    def _check(self, other):
+        if not isinstance(other, Selection):
+            return NotImplemented
+        if other.n != self.n:
+            raise ValueError(f'Selections of {self.n} and {other.n} points')
+
+    def __or__(self, other):
+        if self._check(other) is NotImplemented: return NotImplemented
+        return self._from_bits(self.n, self.bits | other.bits)
+
+    def __and__(self, other):
+        if self._check(other) is NotImplemented: return NotImplemented
+        return self._from_bits(self.n, self.bits & other.bits)
+
+    def __sub__(self, other):
+        if self._check(other) is NotImplemented: return NotImplemented
+        return self._from_bits(self.n, self.bits & ~other.bits)
+
+    def __invert__(self):
+        bits = ~self.bits
+        if self.n % 8:
+            # keep the padding bits of the last byte cleared
+            bits[-1] &= np.uint8(0xff << (8 - self.n % 8) & 0xff)
+        return self._from_bits(self.n, bits)
+
+    def __eq__(self, other):
+        if not isinstance(other, Selection):
+            return NotImplemented
+        return self.n == other.n and np.array_equal(self.bits, other.bits)
+
+    def __len__(self):
+        # number of selected points
+        if hasattr(np, 'bitwise_count'):
+            return int(np.bitwise_count(self.bits).sum())
+        return int(np.unpackbits(self.bits).sum())
+
+    def __bool__(self):
+        return bool(self.bits.any())
+
+    def __array__(self, dtype=None, copy=None):
+        indices = self.indices()
+        return indices if dtype is None else indices.astype(dtype)
+
+    def __repr__(self):
+        return f'Selection({len(self)} of {self.n} points)'
+
+class SelectionCoordinator:
+    def __init__(self, source: DataSource):
+        """
+        One selection shared by all the views of the rows of a data
+        source (linked brushing).
+
+        Brushes report selections to the coordinator (`select` as their
+        callback, or `update` as their live `on_change`), which forwards
+        the changes to every view. Only the views in which the change is
+        visible are redrawn, and the redraws of the views sharing a
+        canvas are coalesced into one per turn of the event loop.
+
+        Parameters
+        ----------
+        source : `DataSource`
+            The data source whose rows are selected.
+        """
+        self.source = source
+        self.views = []
+        self.brushes = []
+        self.selection = Selection(len(source))
+        # views waiting for a redraw, per canvas
+        self._pending = {}
+        self.source.subscribe(self._on_source_changed)
+
+    def add_view(self, view):
+        """
+        Link a view (e.g., a `BubbleChart`) to the selection. The view
+        needs `update_selection(added, removed)`, `shows(points)`,
+        `draw(redraw)` and `blit_update()`.
+        """
+        self.views.append(view)
+        view.selected = self.selection.copy()
+
+    def remove_view(self, view):
+        self.views.remove(view)
+
+    def add_brush(self, brush):
+        """
+        Report the selections of a `Brush` (live or not) to the 
+        coordinator, and let its add and subtract modes start from the
+        shared selection.
+        """
+        self.brushes.append(brush)
+        brush.selection = self.selection
+        if brush.on_change is not None:
+            brush.on_change = self.update
+        else:
+            brush.cb = self.select
+
+    def select(self, selected: Selection | ArrayLike):
+        """
+        Replace the selection.
+        """
+        if not isinstance(selected, Selection):
+            selected = Selection(self.selection.n, selected)
+        self.update(np.asarray(selected - self.selection), 
+                    np.asarray(self.selection - selected))
+
+    def update(self, added: ArrayLike, removed: ArrayLike):
+        """
+        Add and remove rows from the selection.
+        """
+        added = np.asarray(added, dtype=np.intp)
+        removed = np.asarray(removed, dtype=np.intp)
+        added = added[~self.selection.contains(added)]
+        removed = removed[self.selection.contains(removed)]
+        if added.shape[0] == 0 and removed.shape[0] == 0:
+            return
+        was_empty = not self.selection
+        self.selection.remove(removed)
+        self.selection.add(added)
+        for brush in self.brushes:
+            brush.selection = self.selection
+        # setting or clearing the selection changes every point
+        everything = was_empty != (not self.selection)
+        changed = np.concatenate([added, removed])
+        for view in self.views:
+            view.update_selection(added, removed)
+            if everything or view.shows(changed):
+                self._schedule(view)
+
+    def _on_source_changed(self, names):
+        if len(self.source) != self.selection.n:
+            # different rows: the views start from an empty selection too
+            self.selection = Selection(len(self.source))
+
+    def _schedule(self, view):
+        canvas = view.fig.canvas
+        if canvas in self._pending:
+            if view not in self._pending[canvas]:
+                self._pending[canvas].append(view)
+            return
+        self._pending[canvas] = [ view ]
+        timer = canvas.new_timer(interval=0)
+        if type(timer) is TimerBase:
+            # the backend has no event loop (e.g., Agg): draw right away
+            self._flush(canvas)
+            return
+        timer.single_shot = True
+        timer.add_callback(self._flush, canvas)
+        timer.start()
+
+    def _flush(self, canvas):
+        views = self._pending.pop(canvas, [])
+        blits = [ view.draw(redraw=False) for view in views ]
+        if all(blits):
+            for view in views:
+                view.blit_update()
+        else:
+            # a full redraw also redraws (and recaches) the blitted views
+            canvas.draw_idle()
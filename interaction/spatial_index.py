@@ -0,0 +1,124 @@
+import numpy as np
+from numpy.typing import ArrayLike
+
+class GridIndex:
+    def __init__(self, xs: ArrayLike, ys: ArrayLike, points_per_cell=16):
+        """
+        A uniform grid over 2D points answering rectangle queries.
+
+        The points are bucketed by cell and stored contiguously, cell by
+        cell and row of cells by row of cells, so that the points of the
+        cells overlapping a rectangle are found in one slice per row.
+        Only the points of those cells are tested against the rectangle,
+        which makes a query proportional to the size of its result (plus
+        the points of the cells on its border).
+
+        Parameters
+        ----------
+        xs, ys : `ArrayLike`
+            The coordinates of the points. They are referenced, not copied.
+
+        points_per_cell : `int`
+            The average number of points per cell the grid is sized for.
+        """
+        self.points_per_cell = points_per_cell
+        [ self.x, self.y ] = [ None ]*2
+        # cell column / row of every point
+        [ self.cx, self.cy ] = [ None ]*2
+        self.update(xs, ys)
+
+    def update(self, xs: ArrayLike | None = None, ys: ArrayLike | None = None):
+        """
+        Change the x and/or y coordinates of the points. Only the binning
+        along the changed axis is recomputed; the index itself is rebuilt
+        on the next query.
+        """
+        if xs is not None:
+            self.x = np.asarray(xs, dtype=float)
+            self.cx = None
+        if ys is not None:
+            self.y = np.asarray(ys, dtype=float)
+            self.cy = None
+        self._order = None
+
+    def _bin(self, values):
+        # grid size and cell coordinates along one axis
+        n = values.shape[0]
+        ncells = max(1, int(np.ceil(np.sqrt(n / self.points_per_cell))))
+        vmin, vmax = (np.min(values), np.max(values)) if n else (0., 1.)
+        scale = ncells / (vmax - vmin) if vmax > vmin else 0.
+        cells = ((values - vmin) * scale).astype(np.intp)
+        np.minimum(cells, ncells-1, out=cells)
+        return cells, (vmin, scale, ncells)
+
+    def _build(self):
+        if self.cx is None:
+            self.cx, self.xgrid = self._bin(self.x)
+        if self.cy is None:
+            self.cy, self.ygrid = self._bin(self.y)
+        nx, ny = self.xgrid[2], self.ygrid[2]
+        cells = self.cy * nx + self.cx
+        # order within a cell does not matter: query results are sorted
+        self._order = np.argsort(cells.astype(np.int32 if nx*ny < 2**31 
+                                              else np.int64))
+        counts = np.bincount(cells, minlength=nx*ny)
+        self._starts = np.zeros(nx*ny + 1, dtype=np.intp)
+        np.cumsum(counts, out=self._starts[1:])
+        # coordinates in cell order, for locality during queries
+        self._xs = self.x[self._order]
+        self._ys = self.y[self._order]
+
+    def _cell_range(self, lo, hi, grid):
+        vmin, scale, ncells = grid
+        first = int(np.clip(np.floor((lo - vmin) * scale), 0, ncells-1))
+        last = int(np.clip(np.floor((hi - vmin) * scale), 0, ncells-1))
+        return first, last
+
+    def query(self, x1: float, x2: float, y1: float, y2: float):
+        """
+        Indices (sorted) of the points within the rectangle
+        [x1, x2] x [y1, y2], boundaries included.
+        """
+        if self._order is None:
+            self._build()
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        if self.x.shape[0] == 0:
+            return np.empty(0, dtype=np.intp)
+        cx0, cx1 = self._cell_range(x1, x2, self.xgrid)
+        cy0, cy1 = self._cell_range(y1, y2, self.ygrid)
+        # one contiguous slice of the sorted points per row of cells
+        nx = self.xgrid[2]
+        rows = np.arange(cy0, cy1+1) * nx
+        lo = self._starts[rows + cx0]
+        hi = self._starts[rows + cx1 + 1]
+        lengths = hi - lo
+        offsets = np.repeat(lo - (np.cumsum(lengths) - lengths), lengths)
+        candidates = offsets + np.arange(offsets.shape[0])
+        xs, ys = self._xs[candidates], self._ys[candidates]
+        inside = (xs >= x1) & (xs <= x2) & (ys >= y1) & (ys <= y2)
+        return np.sort(self._order[candidates[inside]])
+
+def rectangle_difference(a, b):
+    """
+    Rectangles (x1, x2, y1, y2), boundaries included, covering the part
+    of rectangle `a` that is outside of rectangle `b`. They may overlap
+    `b` along its boundary.
+    """
+    ax1, ax2, ay1, ay2 = a
+    bx1, bx2, by1, by2 = b
+    if bx1 > ax2 or bx2 < ax1 or by1 > ay2 or by2 < ay1:
+        return [ a ]
+    pieces = []
+    # full-height strips left and right of b
+    if ax1 < bx1:
+        pieces.append((ax1, bx1, ay1, ay2))
+    if bx2 < ax2:
+        pieces.append((bx2, ax2, ay1, ay2))
+    # and what remains below and above it
+    x1, x2 = max(ax1, bx1), min(ax2, bx2)
+    if ay1 < by1:
+        pieces.append((x1, x2, ay1, by1))
+    if by2 < ay2:
+        pieces.append((x1, x2, by2, ay2))
+    return pieces
@@ -0,0 +1,94 @@
+import numpy as np
+import hashlib
+import json
+import os
+import zipfile
+from functools import lru_cache
+
+def file_hash(filename: str):
+    """
+    SHA-256 digest of the contents of a file, computed once per version
+    (modification time and size) of the file.
+    """
+    stat = os.stat(filename)
+    return _file_hash(os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+
+@lru_cache(maxsize=16)
+def _file_hash(filename, mtime, size, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as fp:
+        while chunk := fp.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def cache_path(filename: str, **params):
+    """
+    The sidecar file caching arrays computed from a file with some
+    parameters: it is named after a hash of the contents of the file and
+    of the parameters, so that editing the file or changing a parameter
+    leads to another cache file.
+    """
+    key = hashlib.sha256((file_hash(filename) +
+                          json.dumps(params, sort_keys=True)).encode())
+    return f'{filename}.{key.hexdigest()[:16]}.npz'
+
+def save(path: str, arrays: dict):
+    # uncompressed, so that every array is stored contiguously; written
+    # to a temporary file first so that a cache file is always complete
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as fp:
+        np.savez(fp, **arrays)
+    os.replace(tmp, path)
+
+def load(path: str):
+    """
+    Memory-map the arrays of an uncompressed .npz file (`numpy.load`
+    reads them in full).
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as fp:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f'Compressed array in {path}: {info.filename}')
+            # the data follows the local header, whose name and extra
+            # fields may differ from the ones in the central directory
+            fp.seek(info.header_offset)
+            header = fp.read(30)
+            name_length = int.from_bytes(header[26:28], 'little')
+            extra_length = int.from_bytes(header[28:30], 'little')
+            fp.seek(info.header_offset + 30 + name_length + extra_length)
+            version = np.lib.format.read_magic(fp)
+            if version == (1, 0):
+                header = np.lib.format.read_array_header_1_0(fp)
+            else:
+                header = np.lib.format.read_array_header_2_0(fp)
+            shape, fortran, dtype = header
+            name = info.filename.removesuffix('.npy')
+            if 0 in shape:
+                arrays[name] = np.zeros(shape, dtype=dtype)
+            else:
+                arrays[name] = np.memmap(fp, dtype=dtype, mode='r',
+                                         offset=fp.tell(), shape=shape,
+                                         order='F' if fortran else 'C')
+    return arrays
+
+def cached(filename: str, compute, **params):
+    """
+    The arrays computed from a file with some parameters by `compute`
+    (which returns a dictionary of arrays): memory-mapped from the cache
+    file if there is one, otherwise computed and saved in it.
+    """
+    path = cache_path(filename, **params)
+    if os.path.exists(path):
+        try:
+            return load(path)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            # an unreadable cache is computed again
+            pass
+    arrays = compute()
+    try:
+        save(path, arrays)
+    except OSError:
+        # e.g., the directory of the file is read-only
+        pass
+    return arrays
@@ -0,0 +1,197 @@
+import numpy as np
+
+from treearrays import TreeArrays
+
+def subtree_sizes(tree: TreeArrays):
+    sizes = np.ones(len(tree), dtype=np.int64)
+    for level in tree.levels()[:0:-1]:
+        np.add.at(sizes, tree.parent[level], sizes[level])
+    return sizes
+
+def postorder(tree: TreeArrays):
+    """
+    The nodes in postorder. The nodes before a node in preorder are its
+    ancestors and the nodes of subtrees that are complete before it in
+    postorder, which gives its rank: i - depth + size - 1.
+    """
+    index = np.arange(len(tree))
+    rank = index - tree.depth + subtree_sizes(tree) - 1
+    order = np.empty_like(index)
+    order[rank] = index
+    return order
+
+def siblings(tree: TreeArrays):
+    """
+    For every node: its rank among its siblings, its previous sibling
+    (-1 for a first child) and its last child (-1 for a leaf).
+    """
+    n = len(tree)
+    # children are contiguous once sorted by parent, in preorder
+    order = np.argsort(tree.parent, kind='stable')
+    parents = tree.parent[order]
+    first = np.ones(n, dtype=bool)
+    first[1:] = parents[1:] != parents[:-1]
+    start = np.maximum.accumulate(np.where(first, np.arange(n), 0))
+    number = np.empty(n, dtype=np.int64)
+    number[order] = np.arange(n) - start
+    previous = np.full(n, -1, dtype=np.int64)
+    previous[order[1:]] = np.where(first[1:], -1, order[:-1])
+    last_child = np.full(n, -1, dtype=np.int64)
+    last = np.ones(n, dtype=bool)
+    last[:-1] = first[1:]
+    has_parent = parents >= 0
+    last_child[parents[last & has_parent]] = order[last & has_parent]
+    return number, previous, last_child
+
+def buchheim(tree: TreeArrays, sibling=0.1, subtree=0.5):
+    """
+    Position of every node along its level, by the linear-time version
+    of Walker's algorithm (Buchheim, Juenger and Leipert, 2002): nodes
+    have a unit width, and `sibling` (between siblings) or `subtree`
+    (between cousins) space is left between adjacent nodes of a level.
+    """
+    n = len(tree)
+    number, previous, last_child = siblings(tree)
+    # plain lists: the walk below visits one node at a time
+    parent = tree.parent.tolist()
+    first_child = tree.first_child.tolist()
+    number, previous, last_child = \
+        number.tolist(), previous.tolist(), last_child.tolist()
+    prelim, mod = [ 0. ]*n, [ 0. ]*n
+    shift, change = [ 0. ]*n, [ 0. ]*n
+    thread = [ -1 ]*n
+    ancestor = list(range(n))
+    default_ancestor = first_child[:]
+    near, far = 1 + sibling, 1 + subtree
+
+    def next_left(v):
+        return first_child[v] if first_child[v] >= 0 else thread[v]
+
+    def next_right(v):
+        return last_child[v] if last_child[v] >= 0 else thread[v]
+
+    def move_subtree(wl, wr, amount):
+        subtrees = number[wr] - number[wl]
+        change[wr] -= amount / subtrees
+        shift[wr] += amount
+        change[wl] += amount / subtrees
+        prelim[wr] += amount
+        mod[wr] += amount
+
+    def apportion(v, default):
+        w = previous[v]
+        if w < 0:
+            return default
+        vir = vor = v
+        vil = w
+        vol = first_child[parent[v]]
+        sir = sor = mod[v]
+        sil, sol = mod[vil], mod[vol]
+        while True:
+            nr, nl = next_right(vil), next_left(vir)
+            if nr < 0 or nl < 0:
+                break
+            vil, vir = nr, nl
+            vol, vor = next_left(vol), next_right(vor)
+            ancestor[vor] = v
+            gap = near if parent[vil] == parent[vir] else far
+            amount = (prelim[vil] + sil) - (prelim[vir] + sir) + gap
+            if amount > 0:
+                a = ancestor[vil]
+                if parent[a] != parent[v]:
+                    a = default
+                move_subtree(a, v, amount)
+                sir += amount
+                sor += amount
+            sil += mod[vil]
+            sir += mod[vir]
+            sol += mod[vol]
+            sor += mod[vor]
+        if next_right(vil) >= 0 and next_right(vor) < 0:
+            thread[vor] = next_right(vil)
+            mod[vor] += sil - sor
+        if next_left(vir) >= 0 and next_left(vol) < 0:
+            thread[vol] = next_left(vir)
+            mod[vol] += sir - sol
+            default = v
+        return default
+
+    for v in postorder(tree).tolist():
+        w = previous[v]
+        if first_child[v] >= 0:
+            # execute the shifts of the children, right to left
+            total_shift = total_change = 0.
+            c = last_child[v]
+            while c >= 0:
+                prelim[c] += total_shift
+                mod[c] += total_shift
+                total_change += change[c]
+                total_shift += shift[c] + total_change
+                c = previous[c]
+            midpoint = (prelim[first_child[v]] + prelim[last_child[v]]) / 2
+            if w >= 0:
+                prelim[v] = prelim[w] + near
+                mod[v] = prelim[v] - midpoint
+            else:
+                prelim[v] = midpoint
+        elif w >= 0:
+            prelim[v] = prelim[w] + near
+        p = parent[v]
+        if p >= 0:
+            default_ancestor[p] = apportion(v, default_ancestor[p])
+
+    # second walk: add the modifiers of the ancestors, level by level
+    prelim, mod = np.array(prelim), np.array(mod)
+    offset = np.zeros(n)
+    for level in tree.levels()[1:]:
+        parents = tree.parent[level]
+        offset[level] = offset[parents] + mod[parents]
+    return prelim + offset
+
+def tidy_layout(tree: TreeArrays, sibling=0.1, subtree=0.5, level=50,
+                orientation='horizontal'):
+    """
+    Tidy tree layout of an array-backed tree.
+
+    Parameters
+    ----------
+    tree : `TreeArrays`
+        The tree.
+
+    sibling, subtree : `float`
+        The space left between adjacent siblings and between adjacent
+        cousins, in addition to the unit width of a node.
+
+    level : `float`
+        The distance between consecutive levels.
+
+    orientation : `str`
+        'horizontal' (the root on the left), 'vertical' (the root on
+        top) or 'radial' (the root at the center, levels on concentric
+        circles).
+
+    Returns
+    -------
+    The (n, 2) array of the positions of the nodes.
+    """
+    along = buchheim(tree, sibling=sibling, subtree=subtree)
+    return orient(tree.depth * float(level), along, orientation)
+
+def orient(across, along, orientation='horizontal'):
+    """
+    Positions of nodes from their distance `across` the levels (from the
+    root) and their position `along` their level, in a given orientation.
+    """
+    match orientation:
+        case 'horizontal':
+            return np.column_stack([across, along])
+        case 'vertical':
+            return np.column_stack([along, -across])
+        case 'radial':
+            # one unit of width more than the span, so that the first
+            # and last leaves do not meet
+            span = along.max() - along.min() + 1
+            angle = 2 * np.pi * (along - along.min()) / span
+            return np.column_stack([across * np.cos(angle),
+                                    across * np.sin(angle)])
+    raise ValueError(f'Unknown orientation: {orientation}')
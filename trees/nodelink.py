@@ -2,81 +2,338 @@ import numpy as np
 from matplotlib import pyplot as plt 
 import matplotlib as mpl
 import argparse 
-import json 
-from bigtree import Node, reingold_tilford, plot_tree
 from bigtree.utils import iterators
+from matplotlib.widgets import TextBox
+from scipy.spatial import cKDTree
 import math
 
-def import_tree_from_dict(nodeinfo, parent=None):
-    anode = Node(name=nodeinfo['name'], value=0, 
-                parent=parent, children=[])
-    if 'value' in nodeinfo.keys():
-        anode.value = nodeinfo['value']
-        anode.set_attrs({'collapsed': False})
-    if 'children' in nodeinfo.keys():
-        for c in nodeinfo['children']:
-            notused = import_tree_from_dict(c, parent=anode)
-    return anode
-
-def read_tree(filename):
-    with open(filename, 'r') as fp:
-        data = json.load(fp)
-        return import_tree_from_dict(data)
+from tidy import TidyLayout, is_expanded
+from treearrays import TreeArrays, load_tree
+from layout import tidy_layout, orient
+from render import TreeRenderer, PolygonRenderer, paths_to_root
+from spacefill import icicle, sunburst, treemap, rectangles, wedges
+from search import NameIndex
+import cache
+
+def read_tree(filename, use_cache=True):
+    # the (cached) arrays converted to bigtree nodes
+    return read_tree_arrays(filename, use_cache).to_bigtree(collapsed=False)
+
+def read_tree_arrays(filename, use_cache=True):
+    # parsed once, then memory-mapped from the cache file
+    if not use_cache:
+        return load_tree(filename)
+    return TreeArrays(**cache.cached(filename, 
+                                     lambda: load_tree(filename).columns(),
+                                     content='tree'))
 
 class Interaction:
-    def __init__(self, root, ax, canvas, separations={'subtree': 0.5, 'level': 50, 'sibling': 0.1}):
+    def __init__(self, root, ax, canvas, separations={'subtree': 0.5, 'level': 50, 'sibling': 0.1},
+                 tolerance=5, orientation='horizontal'):
         self.root = root 
         self.ax = ax
         self.canvas = canvas
         self.separations = separations
+        # 'horizontal', 'vertical' or 'radial'
+        self.orientation = orientation
+        # maximum distance (in pixels) between a click and the node it picks
+        self.tolerance = tolerance
+        # index of the clicked node, and of the nodes found by a search
         self.clicked = None
+        self.matches = np.zeros(0, dtype=np.int64)
+        # visible nodes, their positions and the index of their parents,
+        # in the same order, and the KD-tree of the positions
+        [ self.nodes, self.positions, self.parents, self.index ] = [ None ]*4
+        [ self.renderer, self.annotation ] = [ None ]*2
+        self.tidy = None
+        self.layout()
+        self.draw()
+
+    def set_separations(self, separations):
+        self.separations = separations
+        self.tidy = None
+        self.layout()
         self.draw()
+
+    def layout(self):
+        """
+        Compute the positions of the visible nodes. The layout itself is
+        only computed from scratch when the separations change; it is
+        updated incrementally when a subtree is collapsed or expanded.
+        """
+        if self.tidy is None:
+            self.tidy = TidyLayout(self.root, 
+                                   sibling=self.separations['sibling'],
+                                   subtree=self.separations['subtree'],
+                                   level=self.separations['level'])
+        self.nodes, positions, self.parents = self.tidy.positions()
+        self.positions = orient(positions[:, 0], positions[:, 1], 
+                                self.orientation)
+        for node, (x, y) in zip(self.nodes, self.positions):
+            node.x, node.y = x, y
+        self.index = cKDTree(self.positions)
+
+    def toggle(self, node):
+        """
+        Collapse or expand the subtree of an internal node.
+        """
+        self.tidy.toggle(node)
+        self.layout()
+        self.update_artists()
+
+    def pick(self, event, k=8):
+        """
+        The index of the node nearest to a mouse event, if it is within
+        `tolerance` pixels of it, or None.
+        """
+        if event.inaxes is not self.ax or self.index is None:
+            return None
+        # search radius in data units (the x and y scales may differ), 
+        # then exact distances in pixels among the k nearest nodes
+        to_data = self.ax.transData.inverted()
+        corner = to_data.transform([event.x + self.tolerance, 
+                                    event.y + self.tolerance])
+        radius = np.max(np.abs(corner - [event.xdata, event.ydata]))
+        dist, ids = self.index.query([event.xdata, event.ydata], k=k,
+                                     distance_upper_bound=radius*math.sqrt(2))
+        ids = np.atleast_1d(ids)[np.isfinite(np.atleast_1d(dist))]
+        if ids.shape[0] == 0:
+            return None
+        pixels = self.ax.transData.transform(self.positions[ids])
+        pdist = np.hypot(pixels[:, 0] - event.x, pixels[:, 1] - event.y)
+        nearest = np.argmin(pdist)
+        if pdist[nearest] > self.tolerance:
+            return None
+        return ids[nearest]
         
     def onclick(self, event):
-        self.clicked = None
-        q = np.array([event.xdata, event.ydata])
-        _min = np.inf
-        for node in iterators.postorder_iter(self.root):
-            p = np.array([node.x, node.y])
-            d = np.linalg.norm(p-q, ord=np.inf)
-            if d < 1:
-                self.clicked = node 
-                break
-        self.draw()
+        # clicking an internal node collapses or expands its subtree,
+        # otherwise the tree is unchanged and only the annotation moves.
+        # Only the descendants of the node move in the preorder of the 
+        # visible nodes, so its index and its path stay valid.
+        self.clicked = self.pick(event)
+        if self.clicked is not None and self.nodes[self.clicked].children:
+            self.toggle(self.nodes[self.clicked])
+        self.annotate()
+        self.highlight()
+        self.canvas.draw_idle()
+
+    def highlight(self):
+        # the paths from the root to the clicked node and the matches
+        nodes = self.matches if self.clicked is None else \
+                np.append(self.matches, self.clicked)
+        self.renderer.highlight(paths_to_root(self.parents, nodes))
+
+    def annotate(self):
+        if self.clicked is None:
+            if self.annotation is not None:
+                self.annotation.set_visible(False)
+            return
+        text, xy = self.describe(self.clicked)
+        if self.annotation is None:
+            self.annotation = self.ax.annotate(text, xy, 
+                        color='black', fontsize='x-small', 
+                        horizontalalignment='left', verticalalignment='center',
+                        xytext=(5, 0), textcoords='offset points')
+            self.annotation.set_bbox(dict(facecolor='white', alpha=0.9, edgecolor='white'))
+        else:
+            self.annotation.set_text(text)
+            self.annotation.xy = xy
+            self.annotation.set_visible(True)
+
+    def describe(self, i):
+        # the text and position of the annotation of a node
+        node = self.nodes[i]
+        return f'{node.name}: {node.value}', (node.x, node.y)
+
+    def _facecolors(self):
+        # collapsed nodes are hollow
+        collapsed = np.array([ bool(node.children) and not is_expanded(node)
+                               for node in self.nodes ])
+        return np.where(collapsed[:, np.newaxis], mpl.colors.to_rgba('white'),
+                        mpl.colors.to_rgba('red'))
+
+    def update_artists(self):
+        """
+        Push the current layout to the existing edges and markers.
+        """
+        self.renderer.set_layout(self.positions, self.parents,
+                                 self._facecolors())
+        self.ax.ignore_existing_data_limits = True
+        self.ax.update_datalim(self.positions)
+        self.ax.autoscale_view()
 
     def draw(self):
         self.ax.clear()
         self.ax.get_xaxis().set_visible(False)
         self.ax.get_yaxis().set_visible(False)
         self.ax.set_axis_off()
-        reingold_tilford(self.root, 
-                         sibling_separation=self.separations['sibling'], 
-                         subtree_separation=self.separations['subtree'], 
-                         level_separation=self.separations['level'])
-        # turn vertical layout to horizontal layout
-        for node in iterators.postorder_iter(self.root):
-            node.x, node.y = -node.y, node.x
-        plot_tree(self.root, ax=ax, color='black', markerfacecolor='red', markersize=10, marker='o')
-        if self.clicked is not None:
-            txt = ax.annotate(f'{self.clicked.name}: {self.clicked.value}', 
-                        [self.clicked.x, self.clicked.y], 
-                        color='black', fontsize='x-small', 
-                        horizontalalignment='left', verticalalignment='center',
-                        xytext=(5, 0), textcoords='offset points')
-            txt.set_bbox(dict(facecolor='white', alpha=0.9, edgecolor='white'))
-            
+        self.renderer = self.make_renderer()
+        # clearing the Axes removed the annotation
+        self.annotation = None
+        self.annotate()
+        self.highlight()
         self.canvas.draw()
 
+    def make_renderer(self):
+        return TreeRenderer(self.ax, self.positions, self.parents,
+                            nodecolors=self._facecolors())
+
+class TreeView(Interaction):
+    def __init__(self, tree, ax, canvas, separations={'subtree': 0.5, 'level': 50, 'sibling': 0.1},
+                 tolerance=5, orientation='horizontal', cache_file=None):
+        """
+        Node-link view of a whole array-backed tree (`TreeArrays`), laid
+        out in linear time, for trees too large for the collapsible view.
+        Nodes are identified by their index. Layouts are cached next to
+        `cache_file` (the file the tree was read from), if it is given.
+        """
+        self.tree = tree
+        self.cache_file = cache_file
+        self.names = None
+        super().__init__(None, ax, canvas, separations=separations,
+                         tolerance=tolerance, orientation=orientation)
+
+    def set_separations(self, separations):
+        self.separations = separations
+        self.layout()
+        self.draw()
+
+    def layout(self):
+        self.nodes = np.arange(len(self.tree))
+        self.parents = self.tree.parent
+        compute = lambda: {
+            'positions': tidy_layout(self.tree, 
+                                     sibling=self.separations['sibling'],
+                                     subtree=self.separations['subtree'],
+                                     level=self.separations['level'],
+                                     orientation=self.orientation) }
+        self.positions = self.cached(compute, view='nodelink', 
+                                     orientation=self.orientation,
+                                     **self.separations)['positions']
+        self.index = cKDTree(self.positions)
+
+    def cached(self, compute, **params):
+        # the arrays of a layout, from the cache if there is one
+        if self.cache_file is None:
+            return compute()
+        return cache.cached(self.cache_file, compute, **params)
+
+    def onclick(self, event):
+        self.clicked = self.pick(event)
+        self.annotate()
+        self.highlight()
+        self.canvas.draw_idle()
+
+    def search(self, text, limit=1000):
+        """
+        Highlight the paths to (at most `limit`) nodes whose name starts
+        with or contains `text`, and annotate the first one.
+        """
+        if self.names is None:
+            self.names = NameIndex(self.tree)
+        self.matches = self.names.search(text.strip(), limit=limit)
+        self.clicked = self.matches[0] if self.matches.shape[0] > 0 else None
+        self.annotate()
+        self.highlight()
+        self.canvas.draw_idle()
+
+    def describe(self, node):
+        return (f'{self.tree.name(node)}: {self.tree.subtree_sum[node]:g}', 
+                self.positions[node])
+
+    def _facecolors(self):
+        return 'red'
+
+class SpaceFillingView(TreeView):
+    def __init__(self, tree, ax, canvas, kind='treemap', cache_file=None):
+        """
+        Space-filling view of an array-backed tree, where the area of a
+        node is proportional to its subtree sum: a squarified 'treemap',
+        an 'icicle' or a 'sunburst'. All the nodes are drawn as one
+        `PolyCollection`.
+        """
+        self.kind = kind
+        super().__init__(tree, ax, canvas, cache_file=cache_file)
+
+    def layout(self):
+        self.nodes = np.arange(len(self.tree))
+        self.parents = self.tree.parent
+        arrays = self.cached(self._compute_layout, view=self.kind)
+        [ self.boxes, self.polygons, self.positions ] = \
+            [ arrays[name] for name in ('boxes', 'polygons', 'positions') ]
+
+    def _compute_layout(self):
+        # boxes (x, y, width, height) in which clicks are looked up: the
+        # rectangles, or intervals of angle and radius for the sunburst
+        match self.kind:
+            case 'treemap':
+                boxes = treemap(self.tree, width=1.5)
+            case 'icicle':
+                boxes = icicle(self.tree)
+            case 'sunburst':
+                boxes = sunburst(self.tree)
+            case _:
+                raise ValueError(f'Unknown view: {self.kind}')
+        x, y, w, h = boxes.T
+        if self.kind == 'sunburst':
+            polygons = wedges(boxes)
+            angle, radius = 2*np.pi*(x + w/2), np.where(y > 0, y + h/2, 0)
+            positions = np.column_stack([radius*np.cos(angle),
+                                         radius*np.sin(angle)])
+        else:
+            polygons = rectangles(boxes)
+            positions = np.column_stack([x + w/2, y + h/2])
+        return { 'boxes': boxes, 'polygons': polygons, 'positions': positions }
+
+    def pick(self, event):
+        """
+        The index of the deepest node under a mouse event, or None.
+        """
+        if event.inaxes is not self.ax:
+            return None
+        u, v = event.xdata, event.ydata
+        if self.kind == 'sunburst':
+            u, v = (math.atan2(v, u) / (2*np.pi)) % 1., math.hypot(u, v)
+        x, y, w, h = self.boxes.T
+        # the nodes under the event are a path from the root, in preorder
+        inside = np.flatnonzero((x <= u) & (u < x + w) & (y <= v) & (v < y + h))
+        return inside[-1] if inside.shape[0] > 0 else None
+
+    def make_renderer(self):
+        depth = self.tree.depth
+        colors = plt.cm.viridis(depth / max(depth.max(), 1))
+        return PolygonRenderer(self.ax, self.polygons, colors)
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Visualize tree with node-link representation')
     parser.add_argument('-i', '--input', type=str, default='flare.json', help='Filename of tree dataset')
+    parser.add_argument('-d', '--depth', type=int, default=None, help='Depth below which subtrees are initially collapsed')
+    parser.add_argument('-o', '--orientation', choices=['horizontal', 'vertical', 'radial'], default='horizontal', help='Orientation of the layout')
+    parser.add_argument('--static', action='store_true', help='Lay out the whole tree at once, without collapsing (for large trees)')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write cached layouts next to the dataset')
+    parser.add_argument('-v', '--view', choices=['nodelink', 'treemap', 'icicle', 'sunburst'], default='nodelink', help='Node-link diagram or space-filling layout')
     args = parser.parse_args()
 
-    root = read_tree(args.input)
-
     fig, ax = plt.subplots(1,1, figsize=(12, 8))
 
-    inter = Interaction(root, ax=ax, canvas=fig.canvas)
+    cache_file = None if args.no_cache else args.input
+    if args.view != 'nodelink':
+        inter = SpaceFillingView(read_tree_arrays(args.input, not args.no_cache), 
+                                 ax=ax, canvas=fig.canvas, kind=args.view, 
+                                 cache_file=cache_file)
+    elif args.static:
+        inter = TreeView(read_tree_arrays(args.input, not args.no_cache), 
+                         ax=ax, canvas=fig.canvas, orientation=args.orientation,
+                         cache_file=cache_file)
+    else:
+        root = read_tree(args.input, not args.no_cache)
+        if args.depth is not None:
+            for node in iterators.preorder_iter(root, 
+                                                filter_condition=lambda n: n.depth == args.depth+1):
+                node.collapsed = True
+        inter = Interaction(root, ax=ax, canvas=fig.canvas, 
+                            orientation=args.orientation)
             
     ax.get_xaxis().set_visible(False)
     ax.get_yaxis().set_visible(False)
@@ -84,4 +341,8 @@ if __name__ == '__main__':
     ax.set_aspect('equal') 
     plt.tight_layout()
     cid = fig.canvas.mpl_connect('button_press_event', inter.onclick)
+    if isinstance(inter, TreeView):
+        # search as you type
+        box = TextBox(fig.add_axes([0.01, 0.01, 0.3, 0.04]), 'Search ')
+        box.on_text_change(inter.search)
     plt.show()
@@ -0,0 +1,156 @@
+import numpy as np
+import matplotlib as mpl
+from matplotlib.collections import LineCollection, PolyCollection
+
+def paths_to_root(parents, nodes):
+    """
+    The indices of some nodes and of all their ancestors, sorted, found
+    one level up at a time.
+    """
+    parents = np.asarray(parents)
+    marked = np.zeros(parents.shape[0], dtype=bool)
+    nodes = np.unique(np.asarray(nodes, dtype=np.int64))
+    while nodes.shape[0] > 0:
+        marked[nodes] = True
+        nodes = parents[nodes]
+        # stop at the root and where the paths merge with marked ones
+        nodes = np.unique(nodes[nodes >= 0])
+        nodes = nodes[~marked[nodes]]
+    return np.flatnonzero(marked)
+
+class TreeRenderer:
+    def __init__(self, ax, positions, parents, nodecolors='red',
+                 edgecolor='black', highlight='orange', s=100):
+        """
+        Draws a node-link layout with two artists: all the edges as one
+        `LineCollection` and all the nodes as one scatter. Highlighting
+        recolors the affected nodes and edges in place.
+
+        Parameters
+        ----------
+        ax : `matplotlib.axes.Axes`
+            The Axes to draw in.
+
+        positions : `numpy.ndarray`
+            The (n, 2) positions of the nodes.
+
+        parents : `numpy.ndarray`
+            The index of the parent of each node (-1 for the root).
+
+        nodecolors : color or list of colors
+            The face colors of the nodes.
+
+        edgecolor, highlight : color
+            The color of the edges, and of highlighted nodes and edges.
+        """
+        self.ax = ax
+        self.edgecolor = mpl.colors.to_rgba(edgecolor)
+        self.highlight_color = mpl.colors.to_rgba(highlight)
+        self.highlighted = np.zeros(0, dtype=np.int64)
+        self._set_topology(parents)
+        self.edges = LineCollection(self._segments(positions),
+                                    colors=[ self.edgecolor ], linewidths=1,
+                                    zorder=1)
+        ax.add_collection(self.edges)
+        self.markers = ax.scatter(positions[:, 0], positions[:, 1], s=s,
+                                  marker='o', facecolors=nodecolors,
+                                  edgecolors='red', zorder=2)
+        self._set_colors(nodecolors, len(positions))
+
+    def _set_topology(self, parents):
+        self.parents = np.asarray(parents)
+        # edge k goes from the parent of node children[k] to that node
+        self.children = np.flatnonzero(self.parents >= 0)
+        self.edge_of = np.full(self.parents.shape[0], -1, dtype=np.int64)
+        self.edge_of[self.children] = np.arange(self.children.shape[0])
+
+    def _segments(self, positions):
+        return np.stack([positions[self.parents[self.children]],
+                         positions[self.children]], axis=1)
+
+    def _set_colors(self, nodecolors, n):
+        # the colors without highlighting, and color arrays owned by the
+        # artists (settled now, as a draw would reset them), which are
+        # then changed in place
+        self.nodecolors = np.broadcast_to(mpl.colors.to_rgba_array(nodecolors),
+                                          (n, 4)).copy()
+        self.markers.set_facecolors(self.nodecolors)
+        self.markers.update_scalarmappable()
+        self.edges.set_colors(np.tile(self.edgecolor,
+                                      (self.children.shape[0], 1)))
+        self.edges.update_scalarmappable()
+        self.highlighted = np.zeros(0, dtype=np.int64)
+
+    def set_layout(self, positions, parents, nodecolors='red'):
+        """
+        Show another layout (e.g., after collapsing a subtree), which
+        clears the highlighting.
+        """
+        self._set_topology(parents)
+        self.edges.set_segments(self._segments(positions))
+        self.markers.set_offsets(positions)
+        self._set_colors(nodecolors, len(positions))
+
+    def highlight(self, nodes):
+        """
+        Highlight some nodes and the edges to their parents (e.g., the
+        result of `paths_to_root`), instead of the ones highlighted before.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        facecolors = self.markers.get_facecolors()
+        colors = self.edges.get_colors()
+        previous = self.highlighted
+        facecolors[previous] = self.nodecolors[previous]
+        edges = self.edge_of[previous]
+        colors[edges[edges >= 0]] = self.edgecolor
+        facecolors[nodes] = self.highlight_color
+        edges = self.edge_of[nodes]
+        colors[edges[edges >= 0]] = self.highlight_color
+        self.highlighted = nodes
+        self.markers.stale = True
+        self.edges.stale = True
+
+class PolygonRenderer:
+    def __init__(self, ax, polygons, facecolors, edgecolor='white',
+                 highlight='orange', linewidth=0.5):
+        """
+        Draws one polygon per node (a space-filling layout) as a single
+        `PolyCollection`, parents first so that children are drawn on
+        top of them. Highlighting recolors the affected nodes in place.
+
+        Parameters
+        ----------
+        ax : `matplotlib.axes.Axes`
+            The Axes to draw in.
+
+        polygons : `numpy.ndarray`
+            The (n, k, 2) vertices of the polygons.
+
+        facecolors : list of colors
+            The face colors of the nodes.
+
+        edgecolor, highlight : color
+            The color of the outlines, and of highlighted nodes.
+        """
+        self.ax = ax
+        self.highlight_color = mpl.colors.to_rgba(highlight)
+        self.nodecolors = mpl.colors.to_rgba_array(facecolors)
+        self.polygons = PolyCollection(polygons, facecolors=self.nodecolors,
+                                       edgecolors=edgecolor,
+                                       linewidths=linewidth)
+        ax.add_collection(self.polygons)
+        self.polygons.update_scalarmappable()
+        ax.update_datalim(polygons.reshape(-1, 2))
+        ax.autoscale_view()
+        self.highlighted = np.zeros(0, dtype=np.int64)
+
+    def highlight(self, nodes):
+        """
+        Highlight some nodes instead of the ones highlighted before.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        facecolors = self.polygons.get_facecolors()
+        facecolors[self.highlighted] = self.nodecolors[self.highlighted]
+        facecolors[nodes] = self.highlight_color
+        self.highlighted = nodes
+        self.polygons.stale = True
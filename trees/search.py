@@ -0,0 +1,75 @@
+import numpy as np
+import re
+from bisect import bisect_left
+
+from treearrays import TreeArrays
+
+class NameIndex:
+    def __init__(self, tree: TreeArrays):
+        """
+        Case-insensitive search of nodes by name, built once for a tree.
+
+        Prefix queries are binary searches in the sorted names. Substring
+        queries scan all the names, joined in one string, with `re`, so
+        that the scan itself runs in C and Python only handles matches.
+        """
+        buffer = bytes(tree.name_buffer)
+        starts, lengths = tree.name_start.tolist(), tree.name_length.tolist()
+        names = [ buffer[s:s+l].decode().casefold().replace('\n', ' ')
+                  for s, l in zip(starts, lengths) ]
+        self.order = np.array(sorted(range(len(names)), key=names.__getitem__),
+                              dtype=np.int64)
+        self.sorted_names = [ names[i] for i in self.order ]
+        # names separated by a newline, which queries cannot contain
+        self.text = '\n'.join(names)
+        self.starts = np.cumsum([ 0 ] + [ len(name) + 1 for name in names[:-1] ])
+
+    def prefix(self, query: str, limit=None):
+        """
+        The indices of the nodes whose name starts with `query`, by name.
+        """
+        query = query.casefold()
+        lo = bisect_left(self.sorted_names, query)
+        # names with the prefix sort before the prefix followed by the
+        # largest code point
+        hi = bisect_left(self.sorted_names, query + '\U0010ffff', lo)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return self.order[lo:hi]
+
+    def substring(self, query: str, limit=None):
+        """
+        The indices of the nodes whose name contains `query`, in preorder.
+        """
+        query = query.casefold()
+        if not query or '\n' in query:
+            return np.zeros(0, dtype=np.int64)
+        positions = []
+        # a node is reported once, from its first match (the search
+        # resumes after the end of its name)
+        pattern = re.compile(re.escape(query))
+        pos = 0
+        while limit is None or len(positions) < limit:
+            m = pattern.search(self.text, pos)
+            if m is None:
+                break
+            positions.append(m.start())
+            end = self.text.find('\n', m.end())
+            if end < 0:
+                break
+            pos = end + 1
+        positions = np.array(positions, dtype=np.int64)
+        return np.searchsorted(self.starts, positions, side='right') - 1
+
+    def search(self, query: str, limit=None):
+        """
+        Nodes whose name starts with `query` (by name), then the other
+        nodes whose name contains it (in preorder).
+        """
+        if not query:
+            return np.zeros(0, dtype=np.int64)
+        first = self.prefix(query, limit)
+        rest = self.substring(query, limit)
+        rest = rest[~np.isin(rest, first)]
+        matches = np.concatenate([first, rest])
+        return matches if limit is None else matches[:limit]
@@ -0,0 +1,151 @@
+import numpy as np
+
+from treearrays import TreeArrays
+
+def partition(tree: TreeArrays):
+    """
+    Split [0, 1] among the nodes of each level in proportion to their
+    subtree sums, every node within the interval of its parent. Returns
+    the start and width of the interval of each node.
+    """
+    sums = tree.subtree_sum
+    start, width = np.zeros(len(tree)), np.zeros(len(tree))
+    width[0] = 1. if sums[0] > 0 else 0.
+    for level in tree.levels()[1:]:
+        parents = tree.parent[level]
+        # siblings are contiguous in a level: the offset of a node is the
+        # sum of its level up to it, minus that of the first sibling
+        before = np.cumsum(sums[level]) - sums[level]
+        first = np.ones(level.shape[0], dtype=bool)
+        first[1:] = parents[1:] != parents[:-1]
+        before -= before[first][np.cumsum(first) - 1]
+        scale = np.divide(width[parents], sums[parents],
+                          out=np.zeros(level.shape[0]), where=sums[parents] > 0)
+        start[level] = start[parents] + before * scale
+        width[level] = sums[level] * scale
+    return start, width
+
+def icicle(tree: TreeArrays, level=1.):
+    """
+    Icicle layout: every node is a rectangle under its parent, as wide as
+    its share of the subtree sum of the parent. Returns the (n, 4) array
+    of the (x, y, width, height) of the rectangles, the root on top.
+    """
+    start, width = partition(tree)
+    return np.column_stack([start, -(tree.depth + 1.) * level, width,
+                            np.full(len(tree), float(level))])
+
+def sunburst(tree: TreeArrays, level=1.):
+    """
+    Sunburst layout: the icicle layout bent around the root, levels
+    being rings of width `level` (the root is a disk). Returns the
+    (n, 4) array of the (start, inner radius, span, ring width) of the
+    ring sectors, angles being fractions of a turn (see `wedges`).
+    """
+    start, width = partition(tree)
+    return np.column_stack([start, tree.depth * float(level), width,
+                            np.full(len(tree), float(level))])
+
+def treemap(tree: TreeArrays, width=1., height=1.):
+    """
+    Squarified treemap (Bruls, Huizing and van Wijk, 2000): the rectangle
+    of every node is split among its children in rows, each row being
+    filled while that improves its worst aspect ratio. Returns the (n, 4)
+    array of the (x, y, width, height) of the rectangles.
+
+    Rows are built greedily, so each group of siblings is laid out in
+    sequence, parents before their children.
+    """
+    sums = tree.subtree_sum.tolist()
+    first_child = tree.first_child.tolist()
+    next_sibling = tree.next_sibling.tolist()
+    rects = np.zeros((len(tree), 4))
+    rects[0] = (0., 0., width, height) if sums[0] > 0 else 0.
+    for node in np.flatnonzero(tree.first_child >= 0).tolist():
+        children = []
+        child = first_child[node]
+        while child >= 0:
+            if sums[child] > 0:
+                children.append(child)
+            child = next_sibling[child]
+        x, y, w, h = rects[node].tolist()
+        if not children or w <= 0 or h <= 0:
+            continue
+        children.sort(key=lambda c: -sums[c])
+        scale = w * h / sums[node]
+        areas = [ sums[c] * scale for c in children ]
+        for c, rect in zip(children, _squarify(areas, x, y, w, h)):
+            rects[c] = rect
+    return rects
+
+def _worst(total, largest, smallest, side):
+    # the worst aspect ratio in a row of areas along a side
+    return max(side * side * largest / (total * total),
+               total * total / (side * side * smallest))
+
+def _squarify(areas, x, y, w, h):
+    # rectangles of decreasing areas (that add up to w*h) in (x, y, w, h)
+    rects = []
+    i, n = 0, len(areas)
+    while i < n:
+        side = min(w, h)
+        total = areas[i]
+        worst = _worst(total, areas[i], areas[i], side)
+        j = i + 1
+        while j < n:
+            candidate = _worst(total + areas[j], areas[i], areas[j], side)
+            if candidate > worst:
+                break
+            total, worst = total + areas[j], candidate
+            j += 1
+        if w >= h:
+            # a column along the left side
+            cw = min(total / h, w)
+            for a in areas[i:j]:
+                rects.append((x, y, cw, a / cw))
+                y += a / cw
+            y -= total / cw
+            x, w = x + cw, w - cw
+        else:
+            # a row along the bottom side
+            rh = min(total / w, h)
+            for a in areas[i:j]:
+                rects.append((x, y, a / rh, rh))
+                x += a / rh
+            x -= total / rh
+            y, h = y + rh, h - rh
+        i = j
+    return rects
+
+def rectangles(rects):
+    """
+    The (n, 4, 2) vertices of (x, y, width, height) rectangles.
+    """
+    x, y, w, h = rects.T
+    return np.stack([np.column_stack([x, y]), np.column_stack([x + w, y]),
+                     np.column_stack([x + w, y + h]),
+                     np.column_stack([x, y + h])], axis=1)
+
+def wedges(boxes, resolution=16):
+    """
+    The (n, 2*resolution, 2) vertices of the ring sectors of a sunburst
+    layout.
+    """
+    start, inner, span, width = boxes.T
+    return sectors(2 * np.pi * start, 2 * np.pi * span, inner, inner + width,
+                   resolution=resolution)
+
+def sectors(angle, span, inner, outer, resolution=16):
+    """
+    The (n, 2*resolution, 2) vertices of ring sectors starting at `angle`
+    and spanning `span` radians, between radii `inner` and `outer`.
+    """
+    t = np.linspace(0., 1., resolution)
+    theta = angle[:, np.newaxis] + span[:, np.newaxis] * t
+    # along the outer arc, then back along the inner one
+    theta = np.concatenate([theta, theta[:, ::-1]], axis=1)
+    radius = np.concatenate([np.repeat(np.asarray(outer, float)[:, np.newaxis],
+                                       resolution, axis=1),
+                             np.repeat(np.asarray(inner, float)[:, np.newaxis],
+                                       resolution, axis=1)], axis=1)
+    return np.stack([radius * np.cos(theta), radius * np.sin(theta)], axis=2)
@@ -0,0 +1,134 @@
+import numpy as np
+
+def is_expanded(node):
+    return len(node.children) > 0 and not getattr(node, 'collapsed', False)
+
+class TidyLayout:
+    def __init__(self, root, sibling=0.1, subtree=0.5, level=50):
+        """
+        A tidy layered layout of the expanded part of a (bigtree) tree,
+        which can be updated incrementally when subtrees are collapsed or
+        expanded.
+
+        Every laid out node caches the positions of its children relative
+        to itself and the left and right contours (extreme positions per
+        level) of its subtree. Collapsing or expanding a node only places
+        its children again, then the children of each of its ancestors,
+        from these cached contours, and stops at the first ancestor whose
+        contour did not change.
+
+        Parameters
+        ----------
+        root : `bigtree.Node`
+            The root of the tree. Nodes whose `collapsed` attribute is
+            True are laid out without their descendants.
+
+        sibling, subtree : `float`
+            The space left between adjacent siblings and between adjacent
+            subtrees below the level of their roots, in addition to the
+            unit width of a node.
+
+        level : `float`
+            The distance between consecutive levels.
+        """
+        self.root = root
+        [ self.sibling, self.subtree, self.level ] = [ sibling, subtree, level ]
+        # node -> positions of its children relative to it
+        self._offsets = {}
+        # node -> (left, right) contours of its subtree, relative to it
+        self._contours = {}
+        self._layout_subtree(root)
+
+    def _layout_subtree(self, top):
+        # place, children first, every expanded node below top that has
+        # not been placed yet
+        stack = [ (top, False) ]
+        while stack:
+            node, ready = stack.pop()
+            if ready or not is_expanded(node):
+                self._place(node)
+                continue
+            stack.append((node, True))
+            stack.extend((c, False) for c in node.children
+                         if c not in self._contours)
+
+    def _place(self, node):
+        """
+        Place the children of a node next to each other from their
+        contours and compute the contours of its subtree. Returns whether
+        they changed.
+        """
+        if not is_expanded(node):
+            self._offsets.pop(node, None)
+            contours = (np.zeros(1), np.zeros(1))
+        else:
+            children = node.children
+            offsets = np.zeros(len(children))
+            left, right = self._contours[children[0]]
+            for i, child in enumerate(children[1:], start=1):
+                cleft, cright = self._contours[child]
+                m = min(right.shape[0], cleft.shape[0])
+                # adjacent roots are siblings, anything below are subtrees
+                gaps = np.full(m, 1 + self.subtree)
+                gaps[0] = 1 + self.sibling
+                offset = np.max(right[:m] - cleft[:m] + gaps)
+                offsets[i] = offset
+                # the right contour now comes from the new child where it
+                # is deep enough, the left one where it is deeper
+                if cright.shape[0] >= right.shape[0]:
+                    right = cright + offset
+                else:
+                    right = np.concatenate([cright + offset,
+                                            right[cright.shape[0]:]])
+                if cleft.shape[0] > left.shape[0]:
+                    left = np.concatenate([left,
+                                           cleft[left.shape[0]:] + offset])
+            # center the node over its first and last children
+            shift = (offsets[0] + offsets[-1]) / 2
+            self._offsets[node] = offsets - shift
+            contours = (np.concatenate([[0], left - shift]),
+                        np.concatenate([[0], right - shift]))
+        previous = self._contours.get(node)
+        self._contours[node] = contours
+        return previous is None or \
+               not (np.array_equal(previous[0], contours[0]) and
+                    np.array_equal(previous[1], contours[1]))
+
+    def toggle(self, node):
+        """
+        Collapse an expanded node or expand a collapsed one, and update
+        the layout.
+        """
+        node.collapsed = not getattr(node, 'collapsed', False)
+        if is_expanded(node):
+            # children laid out before keep their (cached) layout
+            for child in node.children:
+                if child not in self._contours:
+                    self._layout_subtree(child)
+        changed = self._place(node)
+        while changed and node.parent is not None:
+            node = node.parent
+            changed = self._place(node)
+
+    def positions(self):
+        """
+        The visible nodes, in preorder, their (x, y) positions, with the
+        levels along x, and the index of their parent in the list (-1 for
+        the root).
+        """
+        nodes, xs, ys, parents = [], [], [], []
+        stack = [ (self.root, 0., 0, -1) ]
+        while stack:
+            node, y, depth, parent = stack.pop()
+            index = len(nodes)
+            nodes.append(node)
+            xs.append(depth * self.level)
+            ys.append(y)
+            parents.append(parent)
+            if is_expanded(node):
+                offsets = self._offsets[node]
+                # reversed so that the first child is visited first
+                for child, offset in zip(reversed(node.children),
+                                         offsets[::-1]):
+                    stack.append((child, y + offset, depth + 1, index))
+        return nodes, np.column_stack([xs, ys]), np.array(parents)
@@ -0,0 +1,292 @@
+import numpy as np
+import json
+import re
+from array import array
+from bigtree import Node
+
+class TreeArrays:
+    def __init__(self, parent, first_child, next_sibling, depth, value,
+                 name_start, name_length, name_buffer, subtree_sum=None):
+        """
+        A tree stored as columns indexed by node, nodes being numbered in
+        preorder (0 is the root and a parent comes before its children).
+
+        Parameters
+        ----------
+        parent, first_child, next_sibling : `numpy.ndarray`
+            The index of the parent, first child and next sibling of
+            each node, or -1 if there is none.
+
+        depth : `numpy.ndarray`
+            The depth of each node (0 for the root).
+
+        value : `numpy.ndarray`
+            The value of each node (0 if it has none).
+
+        name_start, name_length, name_buffer : `numpy.ndarray`
+            The names of the nodes, UTF-8 encoded and stored one after
+            the other in `name_buffer`: the name of node i is the
+            name_length[i] bytes starting at name_start[i].
+
+        subtree_sum : `numpy.ndarray`
+            The sum of the values of the leaves of the subtree of each
+            node, computed if it is not given.
+        """
+        self.parent = parent
+        self.first_child = first_child
+        self.next_sibling = next_sibling
+        self.depth = depth
+        self.value = value
+        self.name_start = name_start
+        self.name_length = name_length
+        self.name_buffer = name_buffer
+        self.subtree_sum = self._subtree_sums() if subtree_sum is None \
+                           else subtree_sum
+
+    def __len__(self):
+        return self.parent.shape[0]
+
+    def columns(self):
+        """
+        The columns by name, from which `TreeArrays(**columns)` builds the
+        tree again (e.g., once saved with numpy).
+        """
+        return { name: getattr(self, name)
+                 for name in ('parent', 'first_child', 'next_sibling', 'depth',
+                              'value', 'name_start', 'name_length',
+                              'name_buffer', 'subtree_sum') }
+
+    def _subtree_sums(self):
+        # a leaf contributes its value, an internal node the sum of its
+        # children's sums, accumulated one level at a time, bottom up
+        sums = np.where(self.first_child < 0, self.value, 0.)
+        for level in self.levels()[:0:-1]:
+            np.add.at(sums, self.parent[level], sums[level])
+        return sums
+
+    def levels(self):
+        """
+        The indices of the nodes of each level, from the root down (in
+        preorder within a level).
+        """
+        order = np.argsort(self.depth, kind='stable')
+        bounds = np.searchsorted(self.depth[order],
+                                 np.arange(self.depth.max(initial=0) + 2))
+        return [ order[bounds[d]:bounds[d+1]]
+                 for d in range(bounds.shape[0] - 1) ]
+
+    def is_leaf(self):
+        return self.first_child < 0
+
+    def name(self, i: int):
+        start = self.name_start[i]
+        return bytes(self.name_buffer[start:start+self.name_length[i]]).decode()
+
+    def names(self):
+        return [ self.name(i) for i in range(len(self)) ]
+
+    def children(self, i: int):
+        """
+        The indices of the children of node i, in order.
+        """
+        children = []
+        child = self.first_child[i]
+        while child >= 0:
+            children.append(child)
+            child = self.next_sibling[child]
+        return np.array(children, dtype=self.parent.dtype)
+
+    def to_bigtree(self, **attrs):
+        """
+        Convert to a `bigtree.Node` tree (e.g., for the bigtree utilities),
+        giving every node the attributes `name`, `value` and `attrs`.
+        """
+        nodes = []
+        for i in range(len(self)):
+            p = self.parent[i]
+            # values are stored as floats, whole ones are given back as int
+            value = self.value[i].item()
+            if value.is_integer():
+                value = int(value)
+            node = Node(name=self.name(i), value=value,
+                        parent=nodes[p] if p >= 0 else None)
+            node.set_attrs(dict(attrs))
+            nodes.append(node)
+        return nodes[0]
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """
+        Build from nested dictionaries with a 'name', an optional 'value'
+        and optional 'children' (as loaded from a JSON file).
+        """
+        return cls._build(_dict_events(data))
+
+    @classmethod
+    def _build(cls, events):
+        # Build the columns from JSON parsing events (as produced by
+        # ijson.basic_parse). Node objects are the maps at the top level
+        # and in the 'children' arrays of other nodes.
+        parent, first_child, next_sibling, last_child = [ array('q')
+                                                          for _ in range(4) ]
+        depth = array('i')
+        value = array('d')
+        name_start, name_length = array('q'), array('i')
+        name_buffer = bytearray()
+        context = []
+        nodes = []
+        key = None
+        for event, data in events:
+            top = context[-1] if context else None
+            if event == 'start_map':
+                if top is None or top == 'children':
+                    i = len(parent)
+                    p = nodes[-1] if nodes else -1
+                    parent.append(p)
+                    first_child.append(-1)
+                    next_sibling.append(-1)
+                    last_child.append(-1)
+                    depth.append(len(nodes))
+                    value.append(0.)
+                    name_start.append(0)
+                    name_length.append(0)
+                    if p >= 0:
+                        if first_child[p] < 0:
+                            first_child[p] = i
+                        else:
+                            next_sibling[last_child[p]] = i
+                        last_child[p] = i
+                    nodes.append(i)
+                    context.append('node')
+                else:
+                    context.append('other')
+            elif event == 'start_array':
+                context.append('children' if top == 'node' and
+                                             key == 'children' else 'other')
+            elif event == 'end_map' or event == 'end_array':
+                if context.pop() == 'node':
+                    nodes.pop()
+            elif event == 'map_key':
+                key = data
+            elif top == 'node':
+                if key == 'name':
+                    encoded = str(data).encode()
+                    name_start[nodes[-1]] = len(name_buffer)
+                    name_length[nodes[-1]] = len(encoded)
+                    name_buffer.extend(encoded)
+                elif key == 'value' and data is not None:
+                    value[nodes[-1]] = float(data)
+        if not parent:
+            raise ValueError('No tree found')
+        columns = [ np.frombuffer(a, dtype=np.int64)
+                    for a in (parent, first_child, next_sibling) ]
+        return cls(*columns, np.frombuffer(depth, dtype=np.int32),
+                   np.frombuffer(value, dtype=np.float64),
+                   np.frombuffer(name_start, dtype=np.int64),
+                   np.frombuffer(name_length, dtype=np.int32),
+                   np.frombuffer(name_buffer, dtype=np.uint8))
+
+def _dict_events(data):
+    # parsing events of nested dictionaries and lists, without recursion
+    stack = [ data ]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, tuple):
+            # a closing marker or a map key
+            yield item
+        elif isinstance(item, dict):
+            yield ('start_map', None)
+            stack.append(('end_map', None))
+            for k, v in reversed(list(item.items())):
+                stack.append(v)
+                stack.append(('map_key', k))
+        elif isinstance(item, list):
+            yield ('start_array', None)
+            stack.append(('end_array', None))
+            stack.extend(reversed(item))
+        elif isinstance(item, str):
+            yield ('string', item)
+        elif isinstance(item, bool):
+            yield ('boolean', item)
+        elif item is None:
+            yield ('null', None)
+        else:
+            yield ('number', item)
+
+_token = re.compile(r'\s*(?:([{}\[\],:])|("(?:[^"\\]|\\.)*")|([^\s{}\[\],:"]+))',
+                    re.S)
+
+def _tokens(fp, chunk_size):
+    # JSON tokens of a file, read chunk by chunk
+    buffer, pos, eof = '', 0, False
+    while True:
+        m = _token.match(buffer, pos)
+        if m is None or (m.end() == len(buffer) and not eof):
+            # the token may continue in the next chunk
+            if eof:
+                if buffer[pos:].strip():
+                    raise ValueError(f'Invalid JSON near: {buffer[pos:pos+20]}')
+                return
+            chunk = fp.read(chunk_size)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        pos = m.end()
+        yield m.groups()
+
+def _json_events(fp, chunk_size=1 << 16):
+    # ijson.basic_parse-like events of a JSON file, without recursion
+    containers = []
+    expect_key = False
+    for punct, string, literal in _tokens(fp, chunk_size):
+        if punct == '{':
+            containers.append('{')
+            expect_key = True
+            yield ('start_map', None)
+        elif punct == '[':
+            containers.append('[')
+            yield ('start_array', None)
+        elif punct == '}' or punct == ']':
+            containers.pop()
+            yield ('end_map' if punct == '}' else 'end_array', None)
+        elif punct == ',':
+            expect_key = containers[-1] == '{'
+        elif punct == ':':
+            expect_key = False
+        elif string is not None:
+            text = json.decoder.scanstring(string, 1)[0]
+            yield ('map_key' if expect_key else 'string', text)
+        else:
+            data = json.loads(literal)
+            if data is None:
+                yield ('null', None)
+            elif isinstance(data, bool):
+                yield ('boolean', data)
+            else:
+                yield ('number', data)
+
+def load_tree(filename: str, streaming=False):
+    """
+    Load a tree from a JSON file of nested nodes with a 'name', an
+    optional 'value' and optional 'children'.
+
+    By default, the file is parsed with `json` and converted without
+    recursion. With `streaming`, or if the file is too deeply nested for
+    `json`, it is parsed incrementally (with ijson if it is installed) so
+    that the nested dictionaries are never held in memory.
+    """
+    if not streaming:
+        try:
+            with open(filename, 'r') as fp:
+                return TreeArrays.from_dict(json.load(fp))
+        except RecursionError:
+            pass
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+    if ijson is not None:
+        with open(filename, 'rb') as fp:
+            return TreeArrays._build(ijson.basic_parse(fp, use_float=True))
+    with open(filename, 'r') as fp:
+        return TreeArrays._build(_json_events(fp))